@@ -0,0 +1,38 @@
+"""
+API Key 认证缓存
+
+进程内缓存 api_key -> user_id，热点 Key 在 TTL 内跳过数据库查询。
+删除/停用/迁移 Key 时调用 invalidate_api_key()；其他 worker 的缓存最迟在 TTL 后失效。
+"""
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+API_KEY_CACHE_TTL = 60.0
+API_KEY_CACHE_MAXSIZE = 10000
+
+# api_key -> (过期时间, user_id)，按最近使用排序
+_cache: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+
+
+def get_cached_user_id(api_key: str) -> Optional[int]:
+    """返回缓存的 user_id，未命中或已过期返回None"""
+    entry = _cache.get(api_key)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        _cache.pop(api_key, None)
+        return None
+    _cache.move_to_end(api_key)
+    return entry[1]
+
+
+def cache_user_id(api_key: str, user_id: int) -> None:
+    _cache[api_key] = (time.monotonic() + API_KEY_CACHE_TTL, user_id)
+    _cache.move_to_end(api_key)
+    if len(_cache) > API_KEY_CACHE_MAXSIZE:
+        _cache.popitem(last=False)
+
+
+def invalidate_api_key(api_key: str) -> None:
+    _cache.pop(api_key, None)
@@ -39,6 +39,8 @@ class Settings(BaseSettings):
     
     qdrant_host: str = "192.168.31.66"
     qdrant_port: int = 6333
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = False
     qdrant_collection: str = "memoryx"
     qdrant_api_key: Optional[str] = None
     
@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Text, JSON, Float, LargeBinary, Enum as SQLEnum
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime, timedelta
@@ -19,6 +21,33 @@ engine = create_engine(
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _async_database_url(url: str) -> str:
+    """同步连接串转换为 asyncpg 驱动的连接串"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# 异步引擎：供 async 路由使用，避免同步查询阻塞事件循环
+# 连接池等待超时设短，池满时快速失败而不是排队拖垮所有请求；
+# 鉴权等高频固定 SQL 走 asyncpg 预编译语句缓存
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    pool_size=20,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_timeout=5,
+    connect_args={"prepared_statement_cache_size": 1024},
+    echo=False
+)
+
+# expire_on_commit=False：提交后仍可直接读取已加载属性，不触发隐式 IO
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 Base = declarative_base()
 
 
@@ -245,9 +274,25 @@ def get_or_create_quota(db, user_id: int) -> UserQuota:
     return quota
 
 
+async def get_or_create_quota_async(db: AsyncSession, user_id: int) -> UserQuota:
+    result = await db.execute(select(UserQuota).where(UserQuota.user_id == user_id))
+    quota = result.scalar_one_or_none()
+    if not quota:
+        quota = UserQuota(user_id=user_id)
+        db.add(quota)
+        await db.commit()
+        await db.refresh(quota)
+    return quota
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -9,11 +9,26 @@ Key hierarchy:
 import os
 import secrets
 import hashlib
-import base64
-from typing import Optional, Tuple
+import binascii
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2
+
+# Fixed salt for deterministic master key derivation
+MASTER_KEY_SALT = b"memoryx_master_salt_v1"
+MASTER_KEY_ITERATIONS = 100000
+
+
+@lru_cache(maxsize=4)
+def _derive_master_key(key_source: str) -> bytes:
+    """
+    Derive the 256-bit master key from a key string with PBKDF2-HMAC-SHA256.
+    
+    Cached per key string so the 100k-iteration derivation runs once per process.
+    """
+    return hashlib.pbkdf2_hmac(
+        "sha256", key_source.encode(), MASTER_KEY_SALT, MASTER_KEY_ITERATIONS, dklen=32
+    )
 
 
 class EncryptionManager:
@@ -30,16 +45,8 @@ class EncryptionManager:
         if not key_source:
             raise ValueError("MEMORYX_MASTER_KEY not set in environment")
         
-        # Derive 256-bit master key from string using PBKDF2
-        # Using a fixed salt for deterministic key derivation
-        salt = b"memoryx_master_salt_v1"
-        kdf = PBKDF2(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000
-        )
-        self.master_key = kdf.derive(key_source.encode())
+        self.master_key = _derive_master_key(key_source)
+        self._master_cipher = AESGCM(self.master_key)
     
     def generate_dek(self) -> bytes:
         """Generate a new 256-bit Data Encryption Key."""
@@ -56,8 +63,7 @@ class EncryptionManager:
             Encrypted DEK with nonce prepended (nonce + ciphertext)
         """
         nonce = secrets.token_bytes(12)
-        aesgcm = AESGCM(self.master_key)
-        encrypted = aesgcm.encrypt(nonce, dek, None)
+        encrypted = self._master_cipher.encrypt(nonce, dek, None)
         # Prepend nonce for decryption
         return nonce + encrypted
     
@@ -73,8 +79,7 @@ class EncryptionManager:
         """
         nonce = encrypted_dek[:12]
         ciphertext = encrypted_dek[12:]
-        aesgcm = AESGCM(self.master_key)
-        return aesgcm.decrypt(nonce, ciphertext, None)
+        return self._master_cipher.decrypt(nonce, ciphertext, None)
     
     def encrypt_content(self, content: str, dek: bytes) -> Tuple[bytes, bytes]:
         """
@@ -88,10 +93,32 @@ class EncryptionManager:
             Tuple of (encrypted_content, nonce)
         """
         nonce = secrets.token_bytes(12)
-        aesgcm = AESGCM(dek)
-        encrypted = aesgcm.encrypt(nonce, content.encode('utf-8'), None)
+        encrypted = AESGCM(dek).encrypt(nonce, content.encode('utf-8'), None)
         return encrypted, nonce
     
+    def encrypt_batch(self, contents: List[str], dek: bytes) -> List[Tuple[bytes, bytes]]:
+        """
+        Encrypt many contents with the same DEK.
+        
+        Builds one cipher for the whole batch and draws all nonces from a
+        single os.urandom call. DEK ciphers are never cached beyond the call,
+        so plaintext data keys don't outlive the request that needed them.
+        
+        Args:
+            contents: The plaintext contents to encrypt
+            dek: The 256-bit Data Encryption Key
+            
+        Returns:
+            List of (encrypted_content, nonce), in the same order as contents
+        """
+        aesgcm = AESGCM(dek)
+        nonce_buf = os.urandom(12 * len(contents))
+        results = []
+        for i, content in enumerate(contents):
+            nonce = nonce_buf[i * 12:(i + 1) * 12]
+            results.append((aesgcm.encrypt(nonce, content.encode('utf-8'), None), nonce))
+        return results
+    
     def decrypt_content(self, encrypted_content: bytes, nonce: bytes, dek: bytes) -> str:
         """
         Decrypt content with a DEK using AES-256-GCM.
@@ -104,19 +131,28 @@ class EncryptionManager:
         Returns:
             The decrypted plaintext content
         """
-        aesgcm = AESGCM(dek)
-        decrypted = aesgcm.decrypt(nonce, encrypted_content, None)
+        decrypted = AESGCM(dek).decrypt(nonce, encrypted_content, None)
         return decrypted.decode('utf-8')
     
     @staticmethod
     def encode_base64(data: bytes) -> str:
         """Encode bytes to base64 string."""
-        return base64.b64encode(data).decode('ascii')
+        return binascii.b2a_base64(data, newline=False).decode('ascii')
     
     @staticmethod
     def decode_base64(data: str) -> bytes:
         """Decode base64 string to bytes."""
-        return base64.b64decode(data)
+        return binascii.a2b_base64(data)
+    
+    @staticmethod
+    def encode_b64_fast(data: bytes) -> bytes:
+        """Encode bytes to base64 bytes, skipping the str conversion."""
+        return binascii.b2a_base64(data, newline=False)
+    
+    @staticmethod
+    def decode_b64_fast(data: bytes) -> bytes:
+        """Decode base64 bytes to bytes."""
+        return binascii.a2b_base64(data)
 
 
 # Global encryption manager instance
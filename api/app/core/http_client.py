@@ -0,0 +1,109 @@
+"""
+共享 HTTP 客户端
+
+LLM / Embedding 请求按事件循环复用同一个 httpx.AsyncClient，
+同一循环内的并发请求共享连接池（keep-alive），后端为 HTTPS 时通过 ALPN 协商 HTTP/2 多路复用。
+Celery 任务每次使用新的事件循环，需在循环关闭前调用 close_http_client()。
+
+每个后端主机配有熔断器：连续失败达到阈值后，在冷却期内请求直接抛出 CircuitOpenError，
+不再占用 worker 等待超时。
+"""
+import asyncio
+import time
+import weakref
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# 熔断配置：连续失败次数阈值与熔断冷却时间（秒）
+CIRCUIT_FAIL_MAX = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+class CircuitOpenError(Exception):
+    """后端处于熔断状态，请求被直接拒绝"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    简单熔断器（进程内）
+
+    - closed: 正常放行，连续失败计数
+    - open: 失败达到 fail_max 后熔断，reset_timeout 内直接拒绝
+    - half-open: 冷却结束后放行试探请求，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, name: str, fail_max: int = CIRCUIT_FAIL_MAX, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.fail_count = 0
+        self.opened_at = None
+
+    def before_call(self):
+        if self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout:
+            raise CircuitOpenError(f"Circuit open for {self.name}")
+
+    def record_success(self):
+        self.fail_count = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.fail_count += 1
+        if self.fail_count >= self.fail_max:
+            self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """按后端主机获取熔断器"""
+    host = urlsplit(url).netloc
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取当前事件循环的共享客户端，超时由调用方按请求传入"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(http2=True, limits=HTTP_LIMITS)
+        _clients[loop] = client
+    return client
+
+
+async def http_post(url: str, **kwargs) -> httpx.Response:
+    """
+    经熔断器保护的 POST 请求
+
+    连接/超时错误与 5xx 响应计为失败；熔断期间抛出 CircuitOpenError。
+    """
+    breaker = get_circuit_breaker(url)
+    breaker.before_call()
+    try:
+        response = await get_http_client().post(url, **kwargs)
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+async def close_http_client() -> None:
+    """关闭当前事件循环的共享客户端"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
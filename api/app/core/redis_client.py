@@ -0,0 +1,23 @@
+"""
+Redis 客户端
+
+复用 Celery broker 所在的 Redis（settings.redis_url），供任务去重、认领码等轻量共享状态使用。
+"""
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+
+from app.core.config import get_settings
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """获取进程级共享的 Redis 客户端（内部自带连接池）"""
+    return redis.Redis.from_url(get_settings().redis_url)
+
+
+@lru_cache()
+def get_async_redis() -> redis.asyncio.Redis:
+    """获取供 async 路由使用的共享 Redis 客户端"""
+    return redis.asyncio.Redis.from_url(get_settings().redis_url)
@@ -17,6 +17,7 @@ import logging
 import time
 
 from app.core.config import get_settings
+from app.core.http_client import close_http_client
 from app.core.database import engine, Base, get_db
 from app.core.database import APIKey
 from app.routers import auth, api_keys, memories, projects, stats, admin
@@ -48,6 +49,7 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting up MemoryX API...")
     yield
+    await close_http_client()
     logger.info("Shutting down MemoryX API...")
 
 
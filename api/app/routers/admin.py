@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timedelta
 
+from app.core.api_key_cache import invalidate_api_key
 from app.core.database import get_db, User, APIKey, Project, Memory, Fact, MemoryJudgment, UserQuota, get_or_create_quota, SubscriptionTier, QUOTA_LIMITS, PRICING
 from app.routers.auth import get_current_user
 
@@ -511,6 +512,7 @@ async def delete_agent(
     
     api_key.is_active = False
     db.commit()
+    invalidate_api_key(api_key.api_key)
     
     return {
         "success": True,
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+import base64
 import secrets
 import hashlib
 
-from app.core.database import get_db, User, Project, APIKey
+from app.core.database import get_async_db, User, Project, APIKey
 
 router = APIRouter(prefix="/agents", tags=["Agent Auto Registration"])
 
@@ -24,10 +28,15 @@ class AgentRegisterResponse(BaseModel):
     is_new_machine: bool
     message: str
 
+def _generate_machine_key(machine_hash: str) -> str:
+    """生成机器 API Key：128 位随机数做 base64url 编码，比 hex 短一截"""
+    token = base64.urlsafe_b64encode(secrets.token_bytes(16)).rstrip(b"=").decode("ascii")
+    return f"mx_m_{machine_hash}_{token}"
+
 @router.post("/auto-register", response_model=AgentRegisterResponse)
 async def auto_register_agent(
     request: AgentRegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Agent 自动注册接口 - 基于机器指纹创建账户"""
     
@@ -37,8 +46,15 @@ async def auto_register_agent(
     
     machine_email = f"machine_{machine_hash}@t0ken.ai"
     
-    # 检查是否已存在
-    user = db.query(User).filter(User.email == machine_email).first()
+    # 检查是否已存在：一次查询同时取回用户、默认项目和对应 API Key
+    result = await db.execute(
+        select(User, Project, APIKey)
+        .outerjoin(Project, and_(Project.owner_id == User.id, Project.is_machine_default == True))
+        .outerjoin(APIKey, and_(APIKey.user_id == User.id, APIKey.project_id == Project.id))
+        .where(User.email == machine_email)
+    )
+    row = result.first()
+    user, project, api_key = row if row else (None, None, None)
     is_new_machine = False
     
     if not user:
@@ -57,8 +73,8 @@ async def auto_register_agent(
             machine_hash=machine_hash
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        # flush 取得自增 ID，三条插入在同一事务内一次提交
+        await db.flush()
         
         # 创建默认项目
         project = Project(
@@ -69,10 +85,9 @@ async def auto_register_agent(
             machine_fingerprint=request.machine_fingerprint
         )
         db.add(project)
-        db.commit()
-        db.refresh(project)
+        await db.flush()
         
-        api_key_value = f"mx_m_{machine_hash}_{secrets.token_hex(16)}"
+        api_key_value = _generate_machine_key(machine_hash)
         api_key = APIKey(
             api_key=api_key_value,
             name=f"Auto-generated for {request.agent_name}",
@@ -81,14 +96,9 @@ async def auto_register_agent(
             is_auto_generated=True
         )
         db.add(api_key)
-        db.commit()
+        await db.commit()
     else:
-        # 获取现有项目和 API Key
-        project = db.query(Project).filter(
-            Project.owner_id == user.id,
-            Project.is_machine_default == True
-        ).first()
-        
+        # 现有项目或 API Key 缺失时补建
         if not project:
             project = Project(
                 name=f"Machine-{machine_hash[:8]}",
@@ -98,16 +108,10 @@ async def auto_register_agent(
                 machine_fingerprint=request.machine_fingerprint
             )
             db.add(project)
-            db.commit()
-            db.refresh(project)
-        
-        api_key = db.query(APIKey).filter(
-            APIKey.user_id == user.id,
-            APIKey.project_id == project.id
-        ).first()
+            await db.flush()
         
         if not api_key:
-            api_key_value = f"mx_m_{machine_hash}_{secrets.token_hex(16)}"
+            api_key_value = _generate_machine_key(machine_hash)
             api_key = APIKey(
                 api_key=api_key_value,
                 name=f"Auto-generated for {request.agent_name}",
@@ -116,12 +120,11 @@ async def auto_register_agent(
                 is_auto_generated=True
             )
             db.add(api_key)
-            db.commit()
         else:
             api_key_value = api_key.api_key
         
         user.last_login = datetime.utcnow()
-        db.commit()
+        await db.commit()
     
     return AgentRegisterResponse(
         agent_id=f"agent_{machine_hash}_{secrets.token_hex(8)}",
@@ -134,28 +137,40 @@ async def auto_register_agent(
 @router.get("/machine-stats")
 async def get_machine_stats(
     api_key: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取当前机器上的 Agent 统计信息"""
     
-    key_record = db.query(APIKey).filter(APIKey.api_key == api_key).first()
-    if not key_record:
+    # 一次查询：调用方 Key -> 机器用户 -> 该用户的全部 Key，只取展示用的列
+    caller = aliased(APIKey)
+    result = await db.execute(
+        select(
+            caller.project_id,
+            User.machine_fingerprint,
+            User.machine_hash,
+            APIKey.name,
+            APIKey.created_at
+        )
+        .select_from(caller)
+        .outerjoin(User, User.id == caller.user_id)
+        .outerjoin(APIKey, APIKey.user_id == User.id)
+        .where(caller.api_key == api_key)
+    )
+    rows = result.all()
+    if not rows:
         raise HTTPException(status_code=401, detail="Invalid API key")
     
-    user = db.query(User).filter(User.id == key_record.user_id).first()
-    if not user or not user.machine_fingerprint:
+    row = rows[0]
+    if not row.machine_fingerprint:
         raise HTTPException(status_code=400, detail="Not a machine account")
     
-    # 统计
-    agents = db.query(APIKey).filter(APIKey.user_id == user.id).all()
-    
     total_memories = 0  # 简化版本，不查询 Memory 表
     
-    return {
-        "machine_fingerprint": user.machine_fingerprint[:16] + "...",
-        "machine_hash": user.machine_hash,
-        "total_agents": len(agents),
-        "agents": [{"name": a.name, "created_at": str(a.created_at)} for a in agents],
+    return ORJSONResponse({
+        "machine_fingerprint": row.machine_fingerprint[:16] + "...",
+        "machine_hash": row.machine_hash,
+        "total_agents": len(rows),
+        "agents": [{"name": r.name, "created_at": r.created_at} for r in rows],
         "total_memories": total_memories,
-        "project_id": key_record.project_id
-    }
+        "project_id": row.project_id
+    })
@@ -1,15 +1,37 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+from typing import Optional
 import secrets
+import orjson
 
-from app.core.database import get_db, User, Project, APIKey
+from app.core.api_key_cache import invalidate_api_key
+from app.core.database import get_async_db, User, Project, APIKey
+from app.core.redis_client import get_async_redis
 
 router = APIRouter(prefix="/agents/claim", tags=["Agent Account Claiming"])
 
-# In-memory storage for claim requests (use Redis in production)
-claim_requests = {}
+# 认领请求存放在 Redis，多 worker 共享，过期由 TTL 自动清理
+CLAIM_TTL_SECONDS = 600
+
+
+def _claim_key(claim_code: str) -> str:
+    return f"claim:{claim_code}"
+
+
+async def _load_claim(claim_code: str) -> Optional[dict]:
+    raw = await get_async_redis().get(_claim_key(claim_code))
+    return orjson.loads(raw) if raw else None
+
+
+async def _update_claim(claim_code: str, claim: dict) -> bool:
+    """覆盖已存在的认领请求并保留剩余 TTL；已过期（键不存在）时返回 False"""
+    return bool(await get_async_redis().set(
+        _claim_key(claim_code), orjson.dumps(claim), xx=True, keepttl=True
+    ))
+
 
 class ClaimCodeRequest(BaseModel):
     machine_fingerprint: str
@@ -32,77 +54,73 @@ class BindAgentRequest(BaseModel):
 @router.post("/initiate", response_model=ClaimCodeResponse)
 async def initiate_claim(
     request: ClaimCodeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Agent 发起认领请求 - 生成验证码"""
     
-    api_key_record = db.query(APIKey).filter(APIKey.api_key == request.api_key).first()
+    result = await db.execute(select(APIKey).where(APIKey.api_key == request.api_key))
+    api_key_record = result.scalars().first()
     if not api_key_record:
         raise HTTPException(status_code=401, detail="Invalid API key")
     
-    user = db.query(User).filter(User.id == api_key_record.user_id).first()
+    user = await db.get(User, api_key_record.user_id)
     if not user or user.machine_fingerprint != request.machine_fingerprint:
         raise HTTPException(status_code=403, detail="Fingerprint mismatch")
     
     # 生成6位验证码
     claim_code = secrets.token_hex(3).upper()
-    expires_at = datetime.utcnow() + timedelta(minutes=10)
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=CLAIM_TTL_SECONDS)
     
-    claim_requests[claim_code] = {
+    claim = {
         "machine_fingerprint": request.machine_fingerprint,
         "api_key": request.api_key,
         "user_id": user.id,
-        "created_at": datetime.utcnow(),
-        "expires_at": expires_at,
+        "created_at": now.isoformat(),
+        "expires_at": expires_at.isoformat(),
         "status": "pending",
         "claimed_by_email": None
     }
+    await get_async_redis().set(_claim_key(claim_code), orjson.dumps(claim), ex=CLAIM_TTL_SECONDS)
     
     claim_url = f"https://t0ken.ai/admin/claim?code={claim_code}"
     
     return ClaimCodeResponse(
         claim_code=claim_code,
-        expires_in=600,
+        expires_in=CLAIM_TTL_SECONDS,
         claim_url=claim_url
     )
 
 @router.get("/status/{claim_code}")
 async def check_claim_status(claim_code: str):
     """检查认领状态"""
-    if claim_code not in claim_requests:
+    claim = await _load_claim(claim_code)
+    if not claim:
         raise HTTPException(status_code=404, detail="Claim code not found")
     
-    claim = claim_requests[claim_code]
-    
-    if datetime.utcnow() > claim["expires_at"]:
-        del claim_requests[claim_code]
-        raise HTTPException(status_code=410, detail="Claim code expired")
-    
     return {
         "status": claim["status"],
-        "expires_at": claim["expires_at"].isoformat()
+        "expires_at": claim["expires_at"]
     }
 
 @router.post("/verify")
 async def verify_claim(
     request: VerifyClaimRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """用户在后台验证认领码"""
-    if request.claim_code not in claim_requests:
+    claim = await _load_claim(request.claim_code)
+    if not claim:
         raise HTTPException(status_code=404, detail="Invalid claim code")
     
-    claim = claim_requests[request.claim_code]
-    
-    if datetime.utcnow() > claim["expires_at"]:
-        del claim_requests[request.claim_code]
-        raise HTTPException(status_code=410, detail="Claim code expired")
-    
     # 查找人类账户
-    human_user = db.query(User).filter(
-        User.email == request.user_email,
-        User.is_machine_account == False
-    ).first()
+    result = await db.execute(
+        select(User).where(
+            User.email == request.user_email,
+            User.is_machine_account == False
+        )
+    )
+    human_user = result.scalars().first()
     
     if not human_user:
         raise HTTPException(status_code=404, detail="Human account not found")
@@ -111,6 +129,9 @@ async def verify_claim(
     claim["claimed_by_email"] = request.user_email
     claim["human_user_id"] = human_user.id
     
+    if not await _update_claim(request.claim_code, claim):
+        raise HTTPException(status_code=410, detail="Claim code expired")
+    
     return {
         "status": "verified",
         "message": "Verification successful. Agent will complete the binding."
@@ -119,14 +140,13 @@ async def verify_claim(
 @router.post("/complete")
 async def complete_binding(
     request: BindAgentRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Agent 完成最终绑定 - 迁移数据到人类账户"""
-    if request.claim_code not in claim_requests:
+    claim = await _load_claim(request.claim_code)
+    if not claim:
         raise HTTPException(status_code=404, detail="Claim code not found")
     
-    claim = claim_requests[request.claim_code]
-    
     if claim["status"] != "verified":
         raise HTTPException(status_code=400, detail="Claim not verified")
     
@@ -137,33 +157,45 @@ async def complete_binding(
     human_user_id = claim["human_user_id"]
     
     try:
-        # 迁移项目
-        projects = db.query(Project).filter(Project.owner_id == machine_user_id).all()
-        for project in projects:
-            project.owner_id = human_user_id
+        # 迁移项目：单条 UPDATE，不逐行加载
+        result = await db.execute(
+            update(Project)
+            .where(Project.owner_id == machine_user_id)
+            .values(owner_id=human_user_id)
+            .returning(Project.id)
+        )
+        migrated_projects = len(result.all())
         
         # 迁移 API Keys
-        api_keys = db.query(APIKey).filter(APIKey.user_id == machine_user_id).all()
-        for key in api_keys:
-            key.user_id = human_user_id
+        result = await db.execute(
+            update(APIKey)
+            .where(APIKey.user_id == machine_user_id)
+            .values(user_id=human_user_id)
+            .returning(APIKey.api_key)
+        )
+        migrated_keys = result.scalars().all()
         
         # 停用机器账户
-        machine_user = db.query(User).filter(User.id == machine_user_id).first()
-        if machine_user:
-            machine_user.is_active = False
-            machine_user.merged_to_user_id = human_user_id
+        await db.execute(
+            update(User)
+            .where(User.id == machine_user_id)
+            .values(is_active=False, merged_to_user_id=human_user_id)
+        )
         
-        db.commit()
+        await db.commit()
+        for key in migrated_keys:
+            invalidate_api_key(key)
         
         claim["status"] = "completed"
+        await _update_claim(request.claim_code, claim)
         
         return {
             "status": "success",
             "message": "Machine account bound to human account",
-            "migrated_projects": len(projects),
+            "migrated_projects": migrated_projects,
             "migrated_memories": 0
         }
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Binding failed: {str(e)}")
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List
 import secrets
+from app.core.api_key_cache import invalidate_api_key
 from app.core.database import get_db
 from app.routers.auth import get_current_user
 from app.core.database import User, APIKey
@@ -68,6 +69,7 @@ def delete_key(key_id: int, current_user: User = Depends(get_current_user), db:
     
     db.delete(key)
     db.commit()
+    invalidate_api_key(key.api_key)
     return {"message": "API Key deleted"}
 
 @router.get("/{key_id}/cursor-config")
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 import logging
 
 from app.core.database import (
-    get_db, User, APIKey, UserQuota, 
-    get_or_create_quota, SubscriptionTier, QUOTA_LIMITS, PRICING
+    get_async_db, User, APIKey, UserQuota, 
+    get_or_create_quota_async, SubscriptionTier, QUOTA_LIMITS, PRICING
 )
 from app.services.memory_core.graph_memory_service import graph_memory_service
 from app.services.memory_queue import (
@@ -71,41 +73,46 @@ def get_effective_tier(user: User) -> SubscriptionTier:
     如果 Pro 订阅已过期，返回 FREE
     """
     if user.subscription_tier == SubscriptionTier.PRO:
+        # 只有 PRO 用户才需要读取当前时间，且只读一次
+        now = datetime.utcnow()
         # 检查订阅是否过期
         if user.subscription_end:
-            if user.subscription_end < datetime.utcnow():
+            if user.subscription_end < now:
                 # 订阅已过期，降级为 FREE
                 return SubscriptionTier.FREE
         elif user.subscription_current_period_end:
             # Stripe 订阅检查
-            if user.subscription_current_period_end < int(datetime.utcnow().timestamp()):
+            if user.subscription_current_period_end < int(now.timestamp()):
                 return SubscriptionTier.FREE
     return user.subscription_tier
 
 
-def get_current_user_with_quota(
+async def get_current_user_with_quota(
     x_api_key: str = Header(None), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> tuple:
     if not x_api_key:
         raise HTTPException(status_code=401, detail="X-API-Key header required")
     
-    api_key = db.query(APIKey).filter(
-        APIKey.api_key == x_api_key, 
-        APIKey.is_active == True
-    ).first()
+    result = await db.execute(
+        select(APIKey).where(
+            APIKey.api_key == x_api_key, 
+            APIKey.is_active == True
+        )
+    )
+    api_key = result.scalars().first()
     
     if not api_key:
         raise HTTPException(status_code=401, detail="Invalid API Key")
     
-    user = db.query(User).filter(User.id == api_key.user_id).first()
+    user = await db.get(User, api_key.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
     # 获取有效订阅层级（检查过期）
     effective_tier = get_effective_tier(user)
     
-    quota = get_or_create_quota(db, user.id)
+    quota = await get_or_create_quota_async(db, user.id)
     
     return user.id, effective_tier, quota, api_key
 
@@ -114,7 +121,7 @@ def get_current_user_with_quota(
 async def create_memory(
     memory: MemoryCreate,
     user_data: tuple = Depends(get_current_user_with_quota),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     添加记忆 - 异步队列处理
@@ -133,7 +140,7 @@ async def create_memory(
         queue=queue
     )
     
-    db.commit()
+    await db.commit()
     
     return {
         "success": True,
@@ -147,7 +154,7 @@ async def create_memory(
 async def batch_create_memories(
     batch: MemoryBatchCreate,
     user_data: tuple = Depends(get_current_user_with_quota),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     批量添加记忆 - 异步队列处理
@@ -175,7 +182,7 @@ async def batch_create_memories(
         queue=queue
     )
     
-    db.commit()
+    await db.commit()
     
     return {
         "success": True,
@@ -219,8 +226,9 @@ async def get_task_status(
 async def list_memories(
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[int] = None,
     user_data: tuple = Depends(get_current_user_with_quota),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     列出用户的所有记忆
@@ -228,17 +236,27 @@ async def list_memories(
     Args:
         limit: 返回数量限制（默认 50）
         offset: 分页偏移（默认 0）
+        cursor: 游标分页，传入上一页返回的 next_cursor；提供时忽略 offset，避免深分页的 OFFSET 扫描
     """
     from app.core.database import Fact
     
     user_id, tier, quota, api_key = user_data
     
-    query = db.query(Fact).filter(Fact.user_id == user_id)
+    total = await db.scalar(select(func.count(Fact.id)).where(Fact.user_id == user_id))
     
-    total = query.count()
-    facts = query.order_by(Fact.created_at.desc()).offset(offset).limit(limit).all()
+    # 两种分页统一按 id 倒序（自增 id 与创建时间同序），offset 页返回的 next_cursor 可直接续接游标分页
+    query = select(Fact).where(Fact.user_id == user_id)
+    if cursor is not None:
+        query = query.where(Fact.id < cursor)
+    else:
+        query = query.offset(offset)
+    query = query.order_by(Fact.id.desc()).limit(limit)
+    facts = (await db.execute(query)).scalars().all()
     
-    return {
+    next_cursor = facts[-1].id if len(facts) == limit else None
+    
+    # 列表可能较大，直接用 orjson 序列化（含 datetime），跳过 jsonable_encoder 与标准库 json
+    return ORJSONResponse({
         "success": True,
         "data": [
             {
@@ -248,21 +266,22 @@ async def list_memories(
                 "importance": fact.importance,
                 "entities": fact.entities or [],
                 "relations": fact.relations or [],
-                "created_at": fact.created_at.isoformat() if fact.created_at else None
+                "created_at": fact.created_at
             }
             for fact in facts
         ],
         "total": total,
         "limit": limit,
-        "offset": offset
-    }
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
 
 
 @router.post("/memories/search", response_model=dict)
 async def search_memories(
     query: SearchQuery,
     user_data: tuple = Depends(get_current_user_with_quota),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     user_id, tier, quota, api_key = user_data
     
@@ -282,7 +301,7 @@ async def search_memories(
         )
         
         quota.increment_cloud_search()
-        db.commit()
+        await db.commit()
         
         new_remaining = remaining - 1 if remaining > 0 else -1
         
@@ -307,7 +326,7 @@ async def search_memories(
 async def search_graph(
     query: SearchQuery,
     user_data: tuple = Depends(get_current_user_with_quota),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     user_id, tier, quota, api_key = user_data
     
@@ -327,7 +346,7 @@ async def search_graph(
         )
         
         quota.increment_cloud_search()
-        db.commit()
+        await db.commit()
         
         return {
             "success": True,
@@ -348,7 +367,7 @@ async def search_graph(
 async def delete_memory(
     memory_id: str,
     user_data: tuple = Depends(get_current_user_with_quota),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     user_id, tier, quota, api_key = user_data
     
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime
 
-from app.core.database import get_db
+from app.core.api_key_cache import get_cached_user_id, cache_user_id
+from app.core.database import get_async_db
 from app.core.database import APIKey
 from app.core.database import Project
 
@@ -24,56 +26,68 @@ class ProjectResponse(BaseModel):
     name: str
     description: Optional[str]
     created_at: str
-    updated_at: str
 
 # Auth helper
-def get_current_user_api(x_api_key: str = Header(None), db: Session = Depends(get_db)):
+async def get_current_user_api(x_api_key: str = Header(None), db: AsyncSession = Depends(get_async_db)):
     if not x_api_key:
         raise HTTPException(status_code=401, detail="X-API-Key header required")
     
-    api_key = db.query(APIKey).filter(APIKey.api_key == x_api_key, APIKey.is_active == True).first()
+    user_id = get_cached_user_id(x_api_key)
+    if user_id is not None:
+        return user_id
+    
+    result = await db.execute(
+        select(APIKey).where(APIKey.api_key == x_api_key, APIKey.is_active == True)
+    )
+    api_key = result.scalars().first()
     
     if not api_key:
         raise HTTPException(status_code=401, detail="Invalid API Key")
     
+    cache_user_id(x_api_key, api_key.user_id)
     return api_key.user_id
 
 @router.get("", response_model=dict)
 async def list_projects(
     user_id: int = Depends(get_current_user_api),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    projects = db.query(Project).filter(Project.user_id == user_id).all()
+    # 只取序列化需要的列，不构造 ORM 对象
+    result = await db.execute(
+        select(Project.id, Project.name, Project.description, Project.created_at)
+        .where(Project.owner_id == user_id)
+    )
+    projects = result.all()
     
-    return {
+    # datetime 直接交给 orjson 在 C 层格式化，不在循环里逐行 isoformat
+    return ORJSONResponse({
         "success": True,
         "data": [
             {
                 "id": p.id,
                 "name": p.name,
                 "description": p.description,
-                "created_at": p.created_at.isoformat() if p.created_at else None,
-                "updated_at": p.updated_at.isoformat() if p.updated_at else None
+                "created_at": p.created_at
             }
             for p in projects
         ],
         "total": len(projects)
-    }
+    })
 
 @router.post("", response_model=dict)
 async def create_project(
     project: ProjectCreate,
     user_id: int = Depends(get_current_user_api),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_project = Project(
-        user_id=user_id,
+        owner_id=user_id,
         name=project.name,
         description=project.description
     )
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     
     return {
         "success": True,
@@ -81,8 +95,7 @@ async def create_project(
             "id": db_project.id,
             "name": db_project.name,
             "description": db_project.description,
-            "created_at": db_project.created_at.isoformat() if db_project.created_at else None,
-            "updated_at": db_project.updated_at.isoformat() if db_project.updated_at else None
+            "created_at": db_project.created_at.isoformat() if db_project.created_at else None
         },
         "message": "Project created successfully"
     }
@@ -91,9 +104,13 @@ async def create_project(
 async def get_project(
     project_id: int,
     user_id: int = Depends(get_current_user_api),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
+    result = await db.execute(
+        select(Project.id, Project.name, Project.description, Project.created_at)
+        .where(Project.id == project_id, Project.owner_id == user_id)
+    )
+    project = result.first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -104,8 +121,7 @@ async def get_project(
             "id": project.id,
             "name": project.name,
             "description": project.description,
-            "created_at": project.created_at.isoformat() if project.created_at else None,
-            "updated_at": project.updated_at.isoformat() if project.updated_at else None
+            "created_at": project.created_at.isoformat() if project.created_at else None
         }
     }
 
@@ -114,9 +130,12 @@ async def update_project(
     project_id: int,
     update: ProjectUpdate,
     user_id: int = Depends(get_current_user_api),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
+    result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == user_id)
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -126,9 +145,8 @@ async def update_project(
     if update.description is not None:
         project.description = update.description
     
-    project.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return {
         "success": True,
@@ -136,8 +154,7 @@ async def update_project(
             "id": project.id,
             "name": project.name,
             "description": project.description,
-            "created_at": project.created_at.isoformat() if project.created_at else None,
-            "updated_at": project.updated_at.isoformat() if project.updated_at else None
+            "created_at": project.created_at.isoformat() if project.created_at else None
         },
         "message": "Project updated successfully"
     }
@@ -146,15 +163,18 @@ async def update_project(
 async def delete_project(
     project_id: int,
     user_id: int = Depends(get_current_user_api),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
+    result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == user_id)
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     
     return {
         "success": True,
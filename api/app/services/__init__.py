@@ -20,7 +20,8 @@ from app.services.scoring import (
     MemoryScorer,
     DecayFunction,
     get_default_weights,
-    create_custom_scorer
+    create_custom_scorer,
+    tokenize_content
 )
 
 from app.services.memory_core.graph_memory_service import (
@@ -57,6 +58,7 @@ __all__ = [
     "DecayFunction",
     "get_default_weights",
     "create_custom_scorer",
+    "tokenize_content",
     
     "graph_memory_service",
     "GraphMemoryService",
@@ -3,16 +3,19 @@
 直接使用 LLM + prompt 提取实体和关系，然后写入 Neo4j
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import logging
-import httpx
+import orjson
 import json
 import asyncio
+import hashlib
+from collections import OrderedDict
 from neo4j import GraphDatabase
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct
 
 from app.core.config import get_settings
+from app.core.http_client import http_post
 from app.core.database import SessionLocal, Fact, Memory
 
 logger = logging.getLogger(__name__)
@@ -252,9 +255,15 @@ EXTRACT_ENTITIES_PROMPT = """分析以下文本，提取所有实体和它们之
 
 
 class GraphMemoryService:
+    # 进程内缓存的 Embedding 条数（bge-m3 1024 维，每条约 32KB）
+    EMBEDDING_CACHE_MAXSIZE = 256
+    
     def __init__(self):
         self.neo4j_driver = None
+        self.qdrant_client: Optional[QdrantClient] = None
         self.qdrant_clients: Dict[str, QdrantClient] = {}
+        # (模型, 文本) 摘要 -> embedding，按最近使用排序
+        self._embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
         self._init_neo4j()
     
     def _init_neo4j(self):
@@ -271,10 +280,15 @@ class GraphMemoryService:
         collection_name = f"{settings.qdrant_collection}_{user_id[:8]}"
         
         if collection_name not in self.qdrant_clients:
-            client = QdrantClient(
-                host=settings.qdrant_host,
-                port=settings.qdrant_port
-            )
+            # 所有集合共用一个客户端（连接池）；开启 prefer_grpc 时走 gRPC，向量载荷用 protobuf 传输
+            if self.qdrant_client is None:
+                self.qdrant_client = QdrantClient(
+                    host=settings.qdrant_host,
+                    port=settings.qdrant_port,
+                    grpc_port=settings.qdrant_grpc_port,
+                    prefer_grpc=settings.qdrant_prefer_grpc
+                )
+            client = self.qdrant_client
             
             try:
                 client.get_collection(collection_name)
@@ -299,27 +313,27 @@ class GraphMemoryService:
         model = settings.llm_model
         
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{settings.ollama_base_url}/v1/chat/completions",
-                    headers={"Content-Type": "application/json"},
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "temperature": temperature
-                    }
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"LLM call failed: {response.status_code} - {response.text}")
-                
-                data = response.json()
-                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                
-                duration_ms = int((time.time() - start_time) * 1000)
-                logger.debug(f"[LLM] Call success | model={model} | duration={duration_ms}ms | response_len={len(content)}")
-                
-                return content
+            response = await http_post(
+                f"{settings.ollama_base_url}/v1/chat/completions",
+                timeout=120.0,
+                headers={"Content-Type": "application/json"},
+                content=orjson.dumps({
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature
+                })
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"LLM call failed: {response.status_code} - {response.text}")
+            
+            data = orjson.loads(response.content)
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            
+            duration_ms = int((time.time() - start_time) * 1000)
+            logger.debug(f"[LLM] Call success | model={model} | duration={duration_ms}ms | response_len={len(content)}")
+            
+            return content
         except Exception as e:
             duration_ms = int((time.time() - start_time) * 1000)
             logger.error(f"[LLM] Call failed | model={model} | duration={duration_ms}ms | error={type(e).__name__}: {str(e)}")
@@ -332,28 +346,28 @@ class GraphMemoryService:
         qwen_model = getattr(settings, 'qwen_model', 'qwen3-14b-sft')
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{qwen_url}/qwen/v1/chat/completions",
-                    headers={"Content-Type": "application/json"},
-                    json={
-                        "model": qwen_model,
-                        "messages": messages,
-                        "temperature": temperature,
-                        "max_tokens": 2000
-                    }
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Qwen call failed: {response.status_code} - {response.text}")
-                
-                data = response.json()
-                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                
-                duration_ms = int((time.time() - start_time) * 1000)
-                logger.debug(f"[QWEN] Call success | model={qwen_model} | duration={duration_ms}ms | response_len={len(content)}")
-                
-                return content
+            response = await http_post(
+                f"{qwen_url}/qwen/v1/chat/completions",
+                timeout=60.0,
+                headers={"Content-Type": "application/json"},
+                content=orjson.dumps({
+                    "model": qwen_model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": 2000
+                })
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"Qwen call failed: {response.status_code} - {response.text}")
+            
+            data = orjson.loads(response.content)
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            
+            duration_ms = int((time.time() - start_time) * 1000)
+            logger.debug(f"[QWEN] Call success | model={qwen_model} | duration={duration_ms}ms | response_len={len(content)}")
+            
+            return content
         except Exception as e:
             duration_ms = int((time.time() - start_time) * 1000)
             logger.error(f"[QWEN] Call failed | model={qwen_model} | duration={duration_ms}ms | error={type(e).__name__}: {str(e)}")
@@ -395,33 +409,57 @@ class GraphMemoryService:
         
         return [{"content": text, "category": "fact", "importance": "medium"}]
     
+    def _embedding_cache_key(self, text: str) -> bytes:
+        return hashlib.sha1(f"{settings.embed_model}\0{text}".encode()).digest()
+    
+    def _embedding_cache_get(self, key: bytes) -> Optional[List[float]]:
+        embedding = self._embedding_cache.get(key)
+        if embedding is not None:
+            self._embedding_cache.move_to_end(key)
+        return embedding
+    
+    def _embedding_cache_put(self, key: bytes, embedding: List[float]):
+        if not embedding:
+            return
+        self._embedding_cache[key] = embedding
+        self._embedding_cache.move_to_end(key)
+        if len(self._embedding_cache) > self.EMBEDDING_CACHE_MAXSIZE:
+            self._embedding_cache.popitem(last=False)
+    
     async def _get_embedding(self, text: str) -> List[float]:
+        # 同一文本常被重复向量化（先查相似记忆，再写入 Qdrant；重复的搜索词），命中直接返回
+        cache_key = self._embedding_cache_key(text)
+        cached = self._embedding_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         import time
         start_time = time.time()
         embed_url = getattr(settings, 'embed_base_url', settings.ollama_base_url)
         embed_model = settings.embed_model
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{embed_url}/v1/embeddings",
-                    headers={"Content-Type": "application/json"},
-                    json={
-                        "model": embed_model,
-                        "input": text
-                    }
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Embedding failed: {response.status_code}")
-                
-                data = response.json()
-                embedding = data.get("data", [{}])[0].get("embedding", [])
-                
-                duration_ms = int((time.time() - start_time) * 1000)
-                logger.debug(f"[EMBED] SUCCESS | model={embed_model} | duration={duration_ms}ms | dim={len(embedding)}")
-                
-                return embedding
+            response = await http_post(
+                f"{embed_url}/v1/embeddings",
+                timeout=30.0,
+                headers={"Content-Type": "application/json"},
+                content=orjson.dumps({
+                    "model": embed_model,
+                    "input": text
+                })
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"Embedding failed: {response.status_code}")
+            
+            data = orjson.loads(response.content)
+            embedding = data.get("data", [{}])[0].get("embedding", [])
+            
+            duration_ms = int((time.time() - start_time) * 1000)
+            logger.debug(f"[EMBED] SUCCESS | model={embed_model} | duration={duration_ms}ms | dim={len(embedding)}")
+            
+            self._embedding_cache_put(cache_key, embedding)
+            return embedding
         except Exception as e:
             duration_ms = int((time.time() - start_time) * 1000)
             logger.error(f"[EMBED] FAILED | model={embed_model} | duration={duration_ms}ms | error={type(e).__name__}: {str(e)}")
@@ -487,55 +525,83 @@ class GraphMemoryService:
         relations_saved = 0
         relations_failed = 0
         
+        # 按标签 / 关系类型分组，每组一条 UNWIND 语句写入，往返次数从 N 降到组数
+        entity_rows: Dict[str, List[Dict]] = {}
+        for entity in entities:
+            entity_name = entity.get("name", "")
+            if not entity_name:
+                continue
+            entity_type = entity.get("type", "Entity")
+            entity_rows.setdefault(entity_type, []).append({
+                "name": entity_name,
+                "properties": entity.get("properties", {})
+            })
+        
+        relation_rows: Dict[str, List[Dict]] = {}
+        for relation in relations:
+            source = relation.get("source", "")
+            target = relation.get("target", "")
+            relation_type = relation.get("relation", "RELATED_TO")
+            
+            if not source or not target:
+                continue
+            
+            relation_type = relation_type.upper().replace(" ", "_")
+            relation_type = "".join(c for c in relation_type if c.isalnum() or c == "_")
+            
+            if not relation_type:
+                relation_type = "RELATED_TO"
+            
+            relation_rows.setdefault(relation_type, []).append({"source": source, "target": target})
+        
         with self.neo4j_driver.session() as session:
-            for entity in entities:
-                entity_name = entity.get("name", "")
-                entity_type = entity.get("type", "Entity")
-                properties = entity.get("properties", {})
-                
-                if not entity_name:
-                    continue
-                
+            for entity_type, rows in entity_rows.items():
                 query = f"""
-                MERGE (e:{entity_type} {{name: $name, user_id: $user_id}})
-                SET e += $properties
+                UNWIND $rows AS row
+                MERGE (e:{entity_type} {{name: row.name, user_id: $user_id}})
+                SET e += row.properties
                 """
                 
                 try:
-                    session.run(query, name=entity_name, user_id=user_id, properties=properties)
-                    entities_saved += 1
-                    logger.debug(f"[NEO4J] Entity saved | name={entity_name} | type={entity_type}")
-                except Exception as e:
-                    entities_failed += 1
-                    logger.error(f"[NEO4J] Entity save failed | name={entity_name} | error={type(e).__name__}: {str(e)}")
-            
-            for relation in relations:
-                source = relation.get("source", "")
-                target = relation.get("target", "")
-                relation_type = relation.get("relation", "RELATED_TO")
-                
-                if not source or not target:
+                    session.run(query, rows=rows, user_id=user_id).consume()
+                    entities_saved += len(rows)
+                    logger.debug(f"[NEO4J] Entities saved | type={entity_type} | count={len(rows)}")
                     continue
+                except Exception as e:
+                    logger.warning(f"[NEO4J] Entity batch failed, retrying per entity | type={entity_type} | count={len(rows)} | error={type(e).__name__}: {str(e)}")
                 
-                relation_type = relation_type.upper().replace(" ", "_")
-                relation_type = "".join(c for c in relation_type if c.isalnum() or c == "_")
-                
-                if not relation_type:
-                    relation_type = "RELATED_TO"
-                
+                # 批量失败时逐条重试，坏数据只影响它自己
+                for row in rows:
+                    try:
+                        session.run(query, rows=[row], user_id=user_id).consume()
+                        entities_saved += 1
+                    except Exception as e:
+                        entities_failed += 1
+                        logger.error(f"[NEO4J] Entity save failed | name={row['name']} | error={type(e).__name__}: {str(e)}")
+            
+            for relation_type, rows in relation_rows.items():
                 query = f"""
-                MATCH (s {{name: $source, user_id: $user_id}})
-                MATCH (t {{name: $target, user_id: $user_id}})
+                UNWIND $rows AS row
+                MATCH (s {{name: row.source, user_id: $user_id}})
+                MATCH (t {{name: row.target, user_id: $user_id}})
                 MERGE (s)-[r:{relation_type}]->(t)
                 """
                 
                 try:
-                    session.run(query, source=source, target=target, user_id=user_id)
-                    relations_saved += 1
-                    logger.debug(f"[NEO4J] Relation saved | {source} --{relation_type}--> {target}")
+                    session.run(query, rows=rows, user_id=user_id).consume()
+                    relations_saved += len(rows)
+                    logger.debug(f"[NEO4J] Relations saved | type={relation_type} | count={len(rows)}")
+                    continue
                 except Exception as e:
-                    relations_failed += 1
-                    logger.error(f"[NEO4J] Relation save failed | {source}->{target} | error={type(e).__name__}: {str(e)}")
+                    logger.warning(f"[NEO4J] Relation batch failed, retrying per relation | type={relation_type} | count={len(rows)} | error={type(e).__name__}: {str(e)}")
+                
+                for row in rows:
+                    try:
+                        session.run(query, rows=[row], user_id=user_id).consume()
+                        relations_saved += 1
+                    except Exception as e:
+                        relations_failed += 1
+                        logger.error(f"[NEO4J] Relation save failed | {row['source']}->{row['target']} | error={type(e).__name__}: {str(e)}")
         
         duration_ms = int((time.time() - start_time) * 1000)
         logger.info(f"[NEO4J] SAVE_COMPLETE | user_id={user_id} | entities={entities_saved}/{len(entities)} | relations={relations_saved}/{len(relations)} | duration={duration_ms}ms")
@@ -709,6 +775,41 @@ class GraphMemoryService:
         finally:
             db.close()
     
+    def iter_user_memories(self, user_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        按页遍历用户的全部记忆（游标分页，按 Fact.id 倒序）
+        
+        每页以上一页最后一条的 id 作为游标，避免 OFFSET 深分页；
+        适用于导出、重新评分等需要全量记忆的批处理。
+        """
+        uid = int(user_id) if user_id.isdigit() else 1
+        cursor = None
+        while True:
+            db = SessionLocal()
+            try:
+                query = db.query(Fact).filter(Fact.user_id == uid)
+                if cursor is not None:
+                    query = query.filter(Fact.id < cursor)
+                facts = query.order_by(Fact.id.desc()).limit(page_size).all()
+            finally:
+                db.close()
+            
+            for fact in facts:
+                yield {
+                    "id": fact.vector_id,
+                    "fact_id": fact.id,
+                    "content": fact.content,
+                    "category": fact.category,
+                    "importance": fact.importance,
+                    "entities": fact.entities or [],
+                    "relations": fact.relations or [],
+                    "created_at": fact.created_at.isoformat() if fact.created_at else None
+                }
+            
+            if len(facts) < page_size:
+                break
+            cursor = facts[-1].id
+    
     async def update_memory_with_judgment(self, user_id: str, new_facts: List[str], existing_memories: List[Dict], input_content: str = "", api_key_id: int = None) -> Dict[str, Any]:
         import uuid
         import time
@@ -1183,9 +1284,11 @@ class GraphMemoryService:
                         db.flush()
                         fact_id = fact_record.id
                         
-                        await self.save_to_qdrant(user_id, vector_id, text, metadata, entities, relations, fact_id=fact_id)
-                        
-                        self.save_to_neo4j(user_id, entities, relations)
+                        # Neo4j 同步驱动放到线程里，与 Qdrant 写入（Embedding + upsert）并行
+                        await asyncio.gather(
+                            self.save_to_qdrant(user_id, vector_id, text, metadata, entities, relations, fact_id=fact_id),
+                            asyncio.to_thread(self.save_to_neo4j, user_id, entities, relations)
+                        )
                         
                         added.append({
                             "id": vector_id,
@@ -1461,7 +1564,9 @@ class GraphMemoryService:
             
             from qdrant_client.models import Filter, FieldCondition, MatchValue
             
-            results = client.query_points(
+            # Qdrant 客户端为同步实现，放到线程池执行，避免阻塞事件循环
+            results = await asyncio.to_thread(
+                client.query_points,
                 collection_name=collection_name,
                 query=query_embedding,
                 limit=limit,
@@ -1492,27 +1597,30 @@ class GraphMemoryService:
                 })
             
             if vector_ids:
-                db = SessionLocal()
-                try:
-                    fact_records = db.query(Fact).filter(Fact.vector_id.in_(vector_ids)).all()
-                    fact_map = {f.vector_id: f for f in fact_records}
-                    
-                    for memory in memories:
-                        fact = fact_map.get(memory["id"])
-                        if fact:
-                            memory["fact_id"] = fact.id
-                            memory["entities"] = fact.entities or []
-                            memory["relations"] = fact.relations or []
-                except Exception as e:
-                    logger.error(f"Failed to query facts: {e}")
-                finally:
-                    db.close()
+                await asyncio.to_thread(self._attach_fact_fields, memories, vector_ids)
             
             return memories
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []
     
+    def _attach_fact_fields(self, memories: List[Dict], vector_ids: List[str]):
+        db = SessionLocal()
+        try:
+            fact_records = db.query(Fact).filter(Fact.vector_id.in_(vector_ids)).all()
+            fact_map = {f.vector_id: f for f in fact_records}
+            
+            for memory in memories:
+                fact = fact_map.get(memory["id"])
+                if fact:
+                    memory["fact_id"] = fact.id
+                    memory["entities"] = fact.entities or []
+                    memory["relations"] = fact.relations or []
+        except Exception as e:
+            logger.error(f"Failed to query facts: {e}")
+        finally:
+            db.close()
+    
     def search_graph(self, user_id: str, entity_name: str = None, relation_type: str = None, limit: int = 10) -> List[Dict[str, Any]]:
         if not self.neo4j_driver:
             return []
@@ -1548,26 +1656,19 @@ class GraphMemoryService:
     
     async def get_context_for_query(self, user_id: str, query: str, limit: int = 5) -> Dict[str, Any]:
         vector_results = await self.search_memories(user_id, query, limit)
-        
-        vector_ids = [r["id"] for r in vector_results]
+        # Neo4j 与 PostgreSQL 查询均为同步调用，整体放到线程池执行
+        return await asyncio.to_thread(self._build_query_context, user_id, vector_results)
+    
+    def _build_query_context(self, user_id: str, vector_results: List[Dict]) -> Dict[str, Any]:
         direct_fact_ids = set()
+        all_entity_names = set()
+        # search_memories 已按 vector_id 回填了 Fact 的实体，无需再查一次
         for r in vector_results:
             if r.get("fact_id"):
                 direct_fact_ids.add(r["fact_id"])
-        
-        all_entity_names = set()
-        db = SessionLocal()
-        try:
-            if vector_ids:
-                fact_records = db.query(Fact).filter(Fact.vector_id.in_(vector_ids)).all()
-                for fact in fact_records:
-                    for entity in (fact.entities or []):
-                        if entity.get("name"):
-                            all_entity_names.add(entity["name"])
-        except Exception as e:
-            logger.error(f"Failed to query facts for entities: {e}")
-        finally:
-            db.close()
+                for entity in r.get("entities") or []:
+                    if entity.get("name"):
+                        all_entity_names.add(entity["name"])
         
         related_entity_names = set()
         for entity_name in list(all_entity_names)[:10]:
@@ -1643,22 +1744,40 @@ class GraphMemoryService:
         if len(texts) == 1:
             return [await self._get_embedding(texts[0])]
         
+        # 只请求缓存未命中的文本，结果回填缓存供后续 _get_embedding 复用
+        keys = [self._embedding_cache_key(text) for text in texts]
+        results = [self._embedding_cache_get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(results) if embedding is None]
+        if not missing:
+            return results
+        if len(missing) == 1:
+            i = missing[0]
+            results[i] = await self._get_embedding(texts[i])
+            return results
+        
         embed_url = getattr(settings, 'embed_base_url', settings.ollama_base_url)
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{embed_url}/v1/embeddings",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "model": settings.embed_model,
-                    "input": texts
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Batch embedding failed: {response.status_code}")
-            
-            data = response.json()
-            return [item.get("embedding", []) for item in data.get("data", [])]
+        response = await http_post(
+            f"{embed_url}/v1/embeddings",
+            timeout=60.0,
+            headers={"Content-Type": "application/json"},
+            content=orjson.dumps({
+                "model": settings.embed_model,
+                "input": [texts[i] for i in missing]
+            })
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Batch embedding failed: {response.status_code}")
+        
+        data = orjson.loads(response.content)
+        embeddings = [item.get("embedding", []) for item in data.get("data", [])]
+        if len(embeddings) != len(missing):
+            raise Exception(f"Batch embedding failed: expected {len(missing)} embeddings, got {len(embeddings)}")
+        
+        for i, embedding in zip(missing, embeddings):
+            results[i] = embedding
+            self._embedding_cache_put(keys[i], embedding)
+        return results
     
     async def add_memories_batch(self, user_id: str, contents: List[str], metadatas: List[Dict] = None, concurrency: int = 3) -> List[Dict[str, Any]]:
         import uuid
@@ -1681,42 +1800,53 @@ class GraphMemoryService:
             all_entities.extend(extraction.get("entities", []))
             all_relations.extend(extraction.get("relations", []))
         
-        self.save_to_neo4j(user_id, all_entities, all_relations)
-        neo4j_time = asyncio.get_event_loop().time() - start_time - extraction_time
-        logger.info(f"Neo4j batch write: {neo4j_time:.2f}s")
-        
-        start_embed = asyncio.get_event_loop().time()
-        embeddings = await self._get_embeddings_batch(contents)
-        embed_time = asyncio.get_event_loop().time() - start_embed
-        logger.info(f"Batch embedding: {len(contents)} texts in {embed_time:.2f}s")
-        
-        memory_ids = [str(uuid.uuid4()) for _ in contents]
-        points = []
-        for i, (content, embedding, memory_id) in enumerate(zip(contents, embeddings, memory_ids)):
-            metadata = metadatas[i] if metadatas and i < len(metadatas) else {}
-            entities_i = extractions[i].get("entities", [])
-            relations_i = extractions[i].get("relations", [])
-            entity_names = [e.get("name", "") for e in entities_i if e.get("name")]
-            relation_list = [f"{r.get('source','')}-{r.get('relation','')}-{r.get('target','')}" for r in relations_i]
-            points.append(PointStruct(
-                id=memory_id,
-                vector=embedding,
-                payload={
-                    "content": content,
-                    "user_id": user_id,
-                    "metadata": metadata,
-                    "entity_names": entity_names,
-                    "relations": relation_list
-                }
-            ))
+        # Neo4j 写入在线程中进行，与下面的批量 Embedding、Qdrant 写入重叠
+        neo4j_start = asyncio.get_event_loop().time()
+        neo4j_task = asyncio.create_task(asyncio.to_thread(self.save_to_neo4j, user_id, all_entities, all_relations))
         
-        client = self._get_qdrant_client(user_id)
-        collection_name = f"{settings.qdrant_collection}_{user_id[:8]}"
-        client.upsert(collection_name=collection_name, points=points)
-        qdrant_time = asyncio.get_event_loop().time() - start_time - extraction_time - neo4j_time - embed_time
-        logger.info(f"Qdrant batch write: {qdrant_time:.2f}s")
+        try:
+            start_embed = asyncio.get_event_loop().time()
+            embeddings = await self._get_embeddings_batch(contents)
+            embed_time = asyncio.get_event_loop().time() - start_embed
+            logger.info(f"Batch embedding: {len(contents)} texts in {embed_time:.2f}s")
+            
+            memory_ids = [str(uuid.uuid4()) for _ in contents]
+            points = []
+            for i, (content, embedding, memory_id) in enumerate(zip(contents, embeddings, memory_ids)):
+                metadata = metadatas[i] if metadatas and i < len(metadatas) else {}
+                entities_i = extractions[i].get("entities", [])
+                relations_i = extractions[i].get("relations", [])
+                entity_names = [e.get("name", "") for e in entities_i if e.get("name")]
+                relation_list = [f"{r.get('source','')}-{r.get('relation','')}-{r.get('target','')}" for r in relations_i]
+                points.append(PointStruct(
+                    id=memory_id,
+                    vector=embedding,
+                    payload={
+                        "content": content,
+                        "user_id": user_id,
+                        "metadata": metadata,
+                        "entity_names": entity_names,
+                        "relations": relation_list
+                    }
+                ))
+            
+            client = self._get_qdrant_client(user_id)
+            collection_name = f"{settings.qdrant_collection}_{user_id[:8]}"
+            client.upsert(collection_name=collection_name, points=points)
+            qdrant_time = asyncio.get_event_loop().time() - start_embed - embed_time
+            logger.info(f"Qdrant batch write: {qdrant_time:.2f}s")
+        finally:
+            # 线程中的 Neo4j 写入无法取消：上面出错时也要等它结束并收取结果，
+            # 避免 "Task exception was never retrieved" 以及与任务重试并发写入
+            await asyncio.gather(neo4j_task, return_exceptions=True)
+        
+        # 任务已结束，await 只用于抛出 Neo4j 写入的异常
+        await neo4j_task
+        neo4j_time = asyncio.get_event_loop().time() - neo4j_start
+        logger.info(f"Neo4j batch write (overlapped): {neo4j_time:.2f}s")
         
         # 写入 PostgreSQL Memory + Fact 表
+        pg_start = asyncio.get_event_loop().time()
         db = SessionLocal()
         stored_facts = []
         try:
@@ -1762,7 +1892,7 @@ class GraphMemoryService:
             for i, fact in enumerate(db.query(Fact).filter(Fact.vector_id.in_(memory_ids)).all()):
                 stored_facts[i]["fact_id"] = fact.id
                 
-            pg_time = asyncio.get_event_loop().time() - start_time - extraction_time - neo4j_time - embed_time - qdrant_time
+            pg_time = asyncio.get_event_loop().time() - pg_start
             logger.info(f"PostgreSQL batch write: {pg_time:.2f}s | facts={len(stored_facts)}")
             
         except Exception as e:
@@ -6,20 +6,42 @@ Memory Queue Tasks - Celery 异步任务
 """
 import logging
 import asyncio
+import hashlib
 import time
 import json
 from typing import Dict, Any, List, Optional
 from celery import shared_task
-import httpx
+import orjson
 
 from app.core.celery_config import celery_app
 from app.services.memory_core.graph_memory_service import graph_memory_service
 from app.core.database import SubscriptionTier
 from app.core.config import get_settings
+from app.core.http_client import http_post, close_http_client, CircuitOpenError
+from app.core.redis_client import get_redis
+
+try:
+    # uvicorn[standard] 已附带 uvloop，Worker 与 API 共用镜像时直接复用
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# 后端熔断时的任务重试间隔（秒），需大于熔断冷却时间
+CIRCUIT_RETRY_COUNTDOWN = 60
+
+# 幂等结果缓存有效期，覆盖任务重试窗口及客户端超时后的重复提交
+IDEMPOTENCY_TTL_SECONDS = 600
+
+# 幂等占位有效期，与 task_time_limit 一致：worker 崩溃时占位最多保留一个任务时长
+IDEMPOTENCY_CLAIM_TTL_SECONDS = 300
+
+# 相同请求正在其他 worker 执行时的重试间隔（秒）
+IDEMPOTENCY_PENDING_COUNTDOWN = 15
+
 
 SENSITIVE_FILTER_PROMPT = """请将以下内容中的敏感信息替换为[已过滤]：
 
@@ -62,37 +84,37 @@ CONVERSATION_SUMMARY_PROMPT = """请对以下内容进行总结。
 async def summarize_conversation(content: str) -> str:
     """使用 LLM 总结对话内容"""
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{settings.ollama_base_url}/v1/chat/completions",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "model": settings.llm_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "你是一个对话总结助手。请简洁地总结对话内容，保留所有重要事实，去除无关信息。"
-                        },
-                        {
-                            "role": "user",
-                            "content": CONVERSATION_SUMMARY_PROMPT.format(content=content)
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 2000
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"LLM summarize failed: {response.status_code} - {response.text}")
-                return content
-            
-            data = response.json()
-            summary = data.get("choices", [{}])[0].get("message", {}).get("content", content)
-            
-            logger.info(f"Summarized: {len(content)} chars -> {len(summary)} chars")
-            return summary
-            
+        response = await http_post(
+            f"{settings.ollama_base_url}/v1/chat/completions",
+            timeout=120.0,
+            headers={"Content-Type": "application/json"},
+            content=orjson.dumps({
+                "model": settings.llm_model,
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "你是一个对话总结助手。请简洁地总结对话内容，保留所有重要事实，去除无关信息。"
+                    },
+                    {
+                        "role": "user",
+                        "content": CONVERSATION_SUMMARY_PROMPT.format(content=content)
+                    }
+                ],
+                "temperature": 0.3,
+                "max_tokens": 2000
+            })
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"LLM summarize failed: {response.status_code} - {response.text}")
+            return content
+        
+        data = orjson.loads(response.content)
+        summary = data.get("choices", [{}])[0].get("message", {}).get("content", content)
+        
+        logger.info(f"Summarized: {len(content)} chars -> {len(summary)} chars")
+        return summary
+        
     except Exception as e:
         logger.error(f"LLM summarize error: {e}")
         return content
@@ -101,44 +123,44 @@ async def summarize_conversation(content: str) -> str:
 async def filter_sensitive_with_llm(content: str) -> Dict[str, Any]:
     """使用 LLM 过滤敏感信息"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{settings.ollama_base_url}/v1/chat/completions",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "model": settings.llm_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "你是一个敏感信息识别助手。请分析内容，识别并替换所有敏感信息。只返回JSON格式结果。"
-                        },
-                        {
-                            "role": "user",
-                            "content": SENSITIVE_FILTER_PROMPT.format(content=content)
-                        }
-                    ],
-                    "temperature": 0.1,
-                    "response_format": {"type": "json_object"}
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"LLM filter failed: {response.status_code} - {response.text}")
-                return {"has_sensitive": False, "filtered_content": content, "sensitive_count": 0}
-            
-            data = response.json()
-            llm_response = data.get("choices", [{}])[0].get("message", {}).get("content", "{}")
-            
-            result = json.loads(llm_response)
-            filtered_content = result.get("filtered_content", content)
-            sensitive_count = filtered_content.count("[已过滤]") if filtered_content else 0
-            
-            return {
-                "has_sensitive": result.get("has_sensitive", False),
-                "filtered_content": filtered_content,
-                "sensitive_count": sensitive_count
-            }
-            
+        response = await http_post(
+            f"{settings.ollama_base_url}/v1/chat/completions",
+            timeout=60.0,
+            headers={"Content-Type": "application/json"},
+            content=orjson.dumps({
+                "model": settings.llm_model,
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "你是一个敏感信息识别助手。请分析内容，识别并替换所有敏感信息。只返回JSON格式结果。"
+                    },
+                    {
+                        "role": "user",
+                        "content": SENSITIVE_FILTER_PROMPT.format(content=content)
+                    }
+                ],
+                "temperature": 0.1,
+                "response_format": {"type": "json_object"}
+            })
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"LLM filter failed: {response.status_code} - {response.text}")
+            return {"has_sensitive": False, "filtered_content": content, "sensitive_count": 0}
+        
+        data = orjson.loads(response.content)
+        llm_response = data.get("choices", [{}])[0].get("message", {}).get("content", "{}")
+        
+        result = json.loads(llm_response)
+        filtered_content = result.get("filtered_content", content)
+        sensitive_count = filtered_content.count("[已过滤]") if filtered_content else 0
+        
+        return {
+            "has_sensitive": result.get("has_sensitive", False),
+            "filtered_content": filtered_content,
+            "sensitive_count": sensitive_count
+        }
+        
     except json.JSONDecodeError as e:
         logger.error(f"LLM response parse failed: {e}")
         return {"has_sensitive": False, "filtered_content": content, "sensitive_count": 0}
@@ -155,15 +177,72 @@ def get_queue_for_tier(tier: SubscriptionTier) -> str:
 
 
 def run_async(coro):
-    """在同步任务中运行异步函数"""
-    loop = asyncio.new_event_loop()
+    """在同步任务中运行异步函数（优先使用 uvloop 事件循环）"""
+    loop = _new_event_loop()
     asyncio.set_event_loop(loop)
     try:
         return loop.run_until_complete(coro)
     finally:
+        loop.run_until_complete(close_http_client())
         loop.close()
 
 
+def _retry_countdown(error: Exception) -> Optional[int]:
+    """后端熔断时延长重试间隔，留出熔断恢复时间；其余错误使用默认间隔"""
+    if isinstance(error, CircuitOpenError):
+        return CIRCUIT_RETRY_COUNTDOWN
+    return None
+
+
+def _idempotency_key(user_id: str, content: str, metadata: Optional[Dict]) -> str:
+    """根据用户与记忆内容生成幂等键"""
+    payload = orjson.dumps(
+        {"user_id": user_id, "content": content, "metadata": metadata or {}},
+        option=orjson.OPT_SORT_KEYS
+    )
+    return f"memx:idem:{hashlib.sha256(payload).hexdigest()}"
+
+
+def _get_idempotent_result(key: str) -> Optional[Dict[str, Any]]:
+    """读取已完成的相同请求结果，Redis 不可用时视为未命中"""
+    try:
+        cached = get_redis().get(f"{key}:resp")
+    except Exception as e:
+        logger.warning(f"[IDEMPOTENCY] Lookup failed | key={key} | error={type(e).__name__}: {str(e)}")
+        return None
+    return orjson.loads(cached) if cached else None
+
+
+def _store_idempotent_result(key: str, result: Dict[str, Any]):
+    """缓存成功结果，供重试或重复入队的相同请求直接返回"""
+    try:
+        get_redis().set(f"{key}:resp", orjson.dumps(result), ex=IDEMPOTENCY_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"[IDEMPOTENCY] Store failed | key={key} | error={type(e).__name__}: {str(e)}")
+
+
+def _claim_idempotency(key: str) -> bool:
+    """
+    原子占位（SET NX），成功返回 True
+    
+    同一请求并发执行（重试与原任务竞争、重复入队）时只有一个任务能占位；
+    Redis 不可用时放行，退化为无幂等保护。
+    """
+    try:
+        return bool(get_redis().set(key, "pending", nx=True, ex=IDEMPOTENCY_CLAIM_TTL_SECONDS))
+    except Exception as e:
+        logger.warning(f"[IDEMPOTENCY] Claim failed | key={key} | error={type(e).__name__}: {str(e)}")
+        return True
+
+
+def _release_idempotency(key: str):
+    """任务失败时释放占位，避免阻塞自身的重试"""
+    try:
+        get_redis().delete(key)
+    except Exception as e:
+        logger.warning(f"[IDEMPOTENCY] Release failed | key={key} | error={type(e).__name__}: {str(e)}")
+
+
 def _log_task_start(task_name: str, task_id: str, user_id: str, **kwargs):
     """记录任务开始日志"""
     extra_info = " | ".join([f"{k}={v}" for k, v in kwargs.items() if v is not None])
@@ -226,6 +305,23 @@ def add_memory_task(
         content_preview=content_preview
     )
     
+    # 在 metadata 被改写前计算幂等键；相同请求已处理过则直接返回上次结果
+    idempotency_key = _idempotency_key(user_id, content, metadata)
+    cached_result = _get_idempotent_result(idempotency_key)
+    if cached_result is not None:
+        duration_ms = int((time.time() - start_time) * 1000)
+        _log_task_end("ADD_MEMORY", task_id, user_id, duration_ms, True, idempotent_hit=True)
+        return cached_result
+    
+    if not _claim_idempotency(idempotency_key):
+        # 相同请求正在执行：稍后重试，届时读取其结果或在占位过期后接手。
+        # Celery 中 max_retries=None 表示沿用任务默认值（3 次），这里显式放宽到覆盖整个占位有效期
+        logger.info(f"[ADD_MEMORY] Duplicate in flight, retry later | task_id={task_id} | user_id={user_id}")
+        raise self.retry(
+            countdown=IDEMPOTENCY_PENDING_COUNTDOWN,
+            max_retries=self.request.retries + IDEMPOTENCY_CLAIM_TTL_SECONDS // IDEMPOTENCY_PENDING_COUNTDOWN + 1
+        )
+    
     try:
         # 检查是否是对话流（需要先总结）
         needs_summary = metadata and metadata.get('needs_summary', False) if metadata else False
@@ -275,6 +371,8 @@ def add_memory_task(
             trace_id=result.get('trace_id', '')
         )
         
+        _store_idempotent_result(idempotency_key, result)
+        
         return result
         
     except Exception as e:
@@ -284,7 +382,8 @@ def add_memory_task(
         _log_task_error("ADD_MEMORY", task_id, user_id, e, retry_count)
         _log_task_end("ADD_MEMORY", task_id, user_id, duration_ms, False, error=str(e))
         
-        raise self.retry(exc=e)
+        _release_idempotency(idempotency_key)
+        raise self.retry(exc=e, countdown=_retry_countdown(e))
 
 
 @celery_app.task(
@@ -325,7 +424,9 @@ def batch_add_memory_task(
     success_count = 0
     error_count = 0
     
-    try:
+    async def _add_items():
+        # 整批共用一个事件循环，LLM / Embedding 请求复用同一连接池
+        nonlocal success_count, error_count
         for i, content in enumerate(contents):
             metadata = metadatas[i] if metadatas and i < len(metadatas) else None
             content_preview = content[:30] + "..." if len(content) > 30 else content
@@ -337,13 +438,11 @@ def batch_add_memory_task(
             )
             
             try:
-                result = run_async(
-                    graph_memory_service.add_memory(
-                        user_id=user_id,
-                        content=content,
-                        metadata=metadata,
-                        api_key_id=api_key_id
-                    )
+                result = await graph_memory_service.add_memory(
+                    user_id=user_id,
+                    content=content,
+                    metadata=metadata,
+                    api_key_id=api_key_id
                 )
                 results.append(result)
                 success_count += 1
@@ -359,6 +458,9 @@ def batch_add_memory_task(
                     "content_preview": content_preview,
                     "index": i
                 })
+    
+    try:
+        run_async(_add_items())
         
         duration_ms = int((time.time() - start_time) * 1000)
         avg_duration_ms = int(duration_ms / total_count) if total_count > 0 else 0
@@ -379,7 +481,7 @@ def batch_add_memory_task(
         _log_task_error("BATCH_ADD", task_id, user_id, e, retry_count)
         _log_task_end("BATCH_ADD", task_id, user_id, duration_ms, False, processed=len(results), error=str(e))
         
-        raise self.retry(exc=e)
+        raise self.retry(exc=e, countdown=_retry_countdown(e))
 
 
 @celery_app.task(
@@ -444,7 +546,7 @@ def update_memory_task(
         _log_task_error("UPDATE_MEMORY", task_id, user_id, e, retry_count)
         _log_task_end("UPDATE_MEMORY", task_id, user_id, duration_ms, False, error=str(e))
         
-        raise self.retry(exc=e)
+        raise self.retry(exc=e, countdown=_retry_countdown(e))
 
 
 @celery_app.task(
@@ -509,4 +611,4 @@ def delete_memory_task(
         _log_task_error("DELETE_MEMORY", task_id, user_id, e, retry_count)
         _log_task_end("DELETE_MEMORY", task_id, user_id, duration_ms, False, error=str(e))
         
-        raise self.retry(exc=e)
+        raise self.retry(exc=e, countdown=_retry_countdown(e))
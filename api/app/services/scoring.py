@@ -3,7 +3,9 @@ Scoring Module - Composite Memory Scoring
 评分模块 - 记忆复合评分算法
 """
 import math
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -17,7 +19,7 @@ class DecayFunction(Enum):
     STEP = "step"                    # 阶梯衰减
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoringFactors:
     """评分子模型"""
     importance: float = 3.0          # 重要性 (1-5)
@@ -40,6 +42,33 @@ class ScoringFactors:
         }
 
 
+# 预计算常数：频率归一化系数 1/log1p(100)（以 100 次访问为满分）与 ln2
+_INV_LOG1P_100 = 1.0 / math.log1p(100)
+_LN2 = math.log(2)
+
+
+def tokenize_content(content: str) -> List[str]:
+    """
+    记忆内容分词（小写、按空白切分、去重排序）
+    
+    同一批候选记忆需要多次评分时，可预先分词后传给 calculate_relevance_score，
+    避免对每条候选记忆重复分词。
+    """
+    return sorted(set(content.lower().split()))
+
+
+# 评分因子顺序，与 MemoryScorer._weighted_terms 返回的加权分数一一对应
+_SCORE_FIELDS = (
+    "importance",
+    "recency",
+    "frequency",
+    "relevance",
+    "category_boost",
+    "user_interaction",
+    "connection_strength"
+)
+
+
 class MemoryScorer:
     """记忆评分器"""
     
@@ -91,27 +120,37 @@ class MemoryScorer:
         Returns:
             float: 综合分数 (0-1)
         """
+        _, _, weighted = self._weighted_terms(factors)
+        return self._finalize_score(sum(weighted))
+    
+    def _weighted_terms(self, factors: ScoringFactors) -> Tuple[float, float, Tuple[float, ...]]:
+        """计算归一化重要性、归一化分类加成及各项加权分数（顺序同 _SCORE_FIELDS）"""
+        weights = self.weights
         # 归一化重要性 (1-5 -> 0.2-1.0)
         normalized_importance = factors.importance / 5.0
-        
-        # 计算加权分数
-        score = (
-            normalized_importance * self.weights["importance"] +
-            factors.recency * self.weights["recency"] +
-            factors.frequency * self.weights["frequency"] +
-            factors.relevance * self.weights["relevance"] +
-            min(factors.category_boost, 2.0) / 2.0 * self.weights["category_boost"] +
-            factors.user_interaction * self.weights["user_interaction"] +
-            factors.connection_strength * self.weights.get("connection_strength", 0.0)
+        normalized_category = min(factors.category_boost, 2.0) / 2.0
+        
+        weighted = (
+            normalized_importance * weights["importance"],
+            factors.recency * weights["recency"],
+            factors.frequency * weights["frequency"],
+            factors.relevance * weights["relevance"],
+            normalized_category * weights["category_boost"],
+            factors.user_interaction * weights["user_interaction"],
+            factors.connection_strength * weights.get("connection_strength", 0.0)
         )
-        
-        # 应用sigmoid函数使分数分布更合理
+        return normalized_importance, normalized_category, weighted
+    
+    def _finalize_score(self, score: float) -> float:
+        """应用sigmoid函数使分数分布更合理，并截断到 0-1"""
         score = self._sigmoid_normalize(score)
-        
         return round(min(max(score, 0.0), 1.0), 4)
     
     def _sigmoid_normalize(self, x: float, steepness: float = 4.0) -> float:
         """使用sigmoid函数归一化分数"""
+        if steepness == 0:
+            # 无陡度时 sigmoid 恒为 0.5，无需计算 exp
+            return 0.5
         # 将0-1映射到更合理的分布
         return 1 / (1 + math.exp(-steepness * (x - 0.5)))
     
@@ -120,7 +159,8 @@ class MemoryScorer:
         created_at: datetime,
         accessed_at: Optional[datetime] = None,
         importance_level: str = "medium",
-        decay_function: DecayFunction = DecayFunction.EXPONENTIAL
+        decay_function: DecayFunction = DecayFunction.EXPONENTIAL,
+        now: Optional[datetime] = None
     ) -> float:
         """
         计算时效性分数
@@ -130,11 +170,12 @@ class MemoryScorer:
             accessed_at: 最后访问时间
             importance_level: 重要性级别
             decay_function: 衰减函数类型
+            now: 当前时间，批量评分时由调用方传入，避免逐条读取时钟
             
         Returns:
             float: 时效性分数 (0-1)
         """
-        now = datetime.utcnow()
+        now = now or datetime.utcnow()
         
         # 使用最近交互时间（访问优先于创建）
         reference_time = accessed_at or created_at
@@ -145,7 +186,7 @@ class MemoryScorer:
         
         if decay_function == DecayFunction.EXPONENTIAL:
             # 指数衰减: score = e^(-λt), λ = ln(2)/half_life
-            decay_rate = math.log(2) / half_life
+            decay_rate = _LN2 / half_life
             score = math.exp(-decay_rate * days_diff)
             
         elif decay_function == DecayFunction.LOGARITHMIC:
@@ -178,13 +219,21 @@ class MemoryScorer:
         
         return round(score, 4)
     
-    def calculate_frequency_score(self, access_count: int, access_history: List[datetime]) -> float:
+    def calculate_frequency_score(
+        self,
+        access_count: int,
+        access_history: List[datetime],
+        now: Optional[datetime] = None,
+        history_sorted: bool = False
+    ) -> float:
         """
         计算访问频率分数
         
         Args:
             access_count: 访问次数
             access_history: 访问历史记录
+            now: 当前时间，批量评分时由调用方传入，避免逐条读取时钟
+            history_sorted: access_history 是否已按时间升序排列，是则二分查找截止位置
             
         Returns:
             float: 频率分数 (0-1)
@@ -193,15 +242,22 @@ class MemoryScorer:
             return 0.0
         
         # 基础分数：对数增长
-        base_score = math.log1p(access_count) / math.log1p(100)  # 归一化到100次
+        base_score = math.log1p(access_count) * _INV_LOG1P_100  # 归一化到100次
         
         # 时间集中度加成（近期频繁访问）
         if len(access_history) >= 3:
-            now = datetime.utcnow()
-            recent_accesses = sum(
-                1 for t in access_history 
-                if (now - t).days <= 7
-            )
+            # (now - t).days <= 7 等价于 t > now - 8天，只需构造一次截止时间
+            cutoff = (now or datetime.utcnow()) - timedelta(days=8)
+            if history_sorted:
+                recent_accesses = len(access_history) - bisect_right(access_history, cutoff)
+            else:
+                # 加成上限为 3 次近期访问，数够即可提前结束扫描
+                recent_accesses = 0
+                for t in access_history:
+                    if t > cutoff:
+                        recent_accesses += 1
+                        if recent_accesses >= 3:
+                            break
             recency_bonus = min(0.3, recent_accesses * 0.1)
         else:
             recency_bonus = 0
@@ -214,7 +270,8 @@ class MemoryScorer:
         query: str,
         memory_content: str,
         memory_tags: List[str],
-        vector_similarity: float
+        vector_similarity: float,
+        content_tokens: Optional[Iterable[str]] = None
     ) -> float:
         """
         计算查询相关性分数
@@ -224,12 +281,12 @@ class MemoryScorer:
             memory_content: 记忆内容
             memory_tags: 记忆标签
             vector_similarity: 向量相似度分数
+            content_tokens: 预先计算的内容分词（见 tokenize_content），提供时不再重新分词
             
         Returns:
             float: 相关性分数 (0-1)
         """
         query_lower = query.lower()
-        content_lower = memory_content.lower()
         
         scores = []
         
@@ -238,8 +295,13 @@ class MemoryScorer:
         
         # 关键词匹配 (30% 权重)
         query_words = set(query_lower.split())
-        content_words = set(content_lower.split())
         if query_words:
+            if content_tokens is None:
+                content_words = set(tokenize_content(memory_content))
+            elif isinstance(content_tokens, (set, frozenset)):
+                content_words = content_tokens
+            else:
+                content_words = set(content_tokens)
             word_overlap = len(query_words & content_words) / len(query_words)
             scores.append(word_overlap * 0.3)
         
@@ -328,82 +390,77 @@ class MemoryScorer:
         Returns:
             Dict: 各项分数明细
         """
-        normalized_importance = factors.importance / 5.0
-        
-        breakdown = {
-            "importance": {
-                "raw_value": factors.importance,
-                "normalized": normalized_importance,
-                "weighted": normalized_importance * self.weights["importance"],
-                "weight": self.weights["importance"]
-            },
-            "recency": {
-                "raw_value": factors.recency,
-                "weighted": factors.recency * self.weights["recency"],
-                "weight": self.weights["recency"]
-            },
-            "frequency": {
-                "raw_value": factors.frequency,
-                "weighted": factors.frequency * self.weights["frequency"],
-                "weight": self.weights["frequency"]
-            },
-            "relevance": {
-                "raw_value": factors.relevance,
-                "weighted": factors.relevance * self.weights["relevance"],
-                "weight": self.weights["relevance"]
-            },
-            "category_boost": {
-                "raw_value": factors.category_boost,
-                "normalized": min(factors.category_boost, 2.0) / 2.0,
-                "weighted": min(factors.category_boost, 2.0) / 2.0 * self.weights["category_boost"],
-                "weight": self.weights["category_boost"]
-            },
-            "user_interaction": {
-                "raw_value": factors.user_interaction,
-                "weighted": factors.user_interaction * self.weights["user_interaction"],
-                "weight": self.weights["user_interaction"]
-            }
-        }
-        
-        if "connection_strength" in self.weights:
-            breakdown["connection_strength"] = {
-                "raw_value": factors.connection_strength,
-                "weighted": factors.connection_strength * self.weights["connection_strength"],
-                "weight": self.weights["connection_strength"]
-            }
+        normalized_importance, normalized_category, weighted = self._weighted_terms(factors)
+        weights = self.weights
+        raw_values = (
+            factors.importance,
+            factors.recency,
+            factors.frequency,
+            factors.relevance,
+            factors.category_boost,
+            factors.user_interaction,
+            factors.connection_strength
+        )
         
-        breakdown["final_score"] = self.calculate_score(factors)
+        breakdown = {}
+        for name, raw_value, weighted_value in zip(_SCORE_FIELDS, raw_values, weighted):
+            if name == "connection_strength" and name not in weights:
+                continue
+            item = {"raw_value": raw_value}
+            if name == "importance":
+                item["normalized"] = normalized_importance
+            elif name == "category_boost":
+                item["normalized"] = normalized_category
+            item["weighted"] = weighted_value
+            item["weight"] = weights[name]
+            breakdown[name] = item
+        
+        breakdown["final_score"] = self._finalize_score(sum(weighted))
         
         return breakdown
 
 
 # 便捷函数
 
+# 默认权重评分器单例，避免便捷函数每次调用都复制并校验权重
+_DEFAULT_SCORER = MemoryScorer()
+
+
+@lru_cache(maxsize=32)
+def _get_weighted_scorer(weight_items: Tuple[Tuple[str, float], ...]) -> MemoryScorer:
+    """按权重配置缓存评分器"""
+    return MemoryScorer(weights=dict(weight_items))
+
+
 def calculate_memory_score(factors: ScoringFactors, weights: Optional[Dict[str, float]] = None) -> float:
     """便捷函数：计算记忆分数"""
-    scorer = MemoryScorer(weights=weights)
+    if not weights:
+        return _DEFAULT_SCORER.calculate_score(factors)
+    scorer = _get_weighted_scorer(tuple(sorted(weights.items())))
     return scorer.calculate_score(factors)
 
 
 def calculate_recency(
     created_at: datetime,
     accessed_at: Optional[datetime] = None,
-    importance_level: str = "medium"
+    importance_level: str = "medium",
+    now: Optional[datetime] = None
 ) -> float:
     """便捷函数：计算时效性分数"""
-    scorer = MemoryScorer()
-    return scorer.calculate_recency_score(created_at, accessed_at, importance_level)
+    return _DEFAULT_SCORER.calculate_recency_score(created_at, accessed_at, importance_level, now=now)
 
 
 def calculate_relevance(
     query: str,
     memory_content: str,
     memory_tags: List[str],
-    vector_similarity: float
+    vector_similarity: float,
+    content_tokens: Optional[Iterable[str]] = None
 ) -> float:
     """便捷函数：计算相关性分数"""
-    scorer = MemoryScorer()
-    return scorer.calculate_relevance_score(query, memory_content, memory_tags, vector_similarity)
+    return _DEFAULT_SCORER.calculate_relevance_score(
+        query, memory_content, memory_tags, vector_similarity, content_tokens=content_tokens
+    )
 
 
 def get_default_weights() -> Dict[str, float]:
@@ -4,8 +4,15 @@ Temporal Knowledge Graph Module - Time-aware Knowledge Representation
 """
 import json
 import logging
+import sys
+import time
+import orjson
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from itertools import chain, count
+from operator import itemgetter
 from typing import Dict, List, Optional, Set, Tuple, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
 from enum import Enum
 import re
@@ -49,9 +56,91 @@ class EntityType(Enum):
     PREFERENCE = "preference"        # 偏好
 
 
-@dataclass
+# 枚举值 -> 成员的查找表，反序列化时跳过 Enum.__call__ 的查找开销
+_ENTITY_TYPE_MAP: Dict[str, EntityType] = {t.value: t for t in EntityType}
+_RELATION_TYPE_MAP: Dict[str, RelationType] = {t.value: t for t in RelationType}
+
+# 枚举成员 -> 整数编码，热点过滤用整数比较代替 Enum 比较
+_ENTITY_TYPE_CODE: Dict[EntityType, int] = {t: i for i, t in enumerate(EntityType)}
+_RELATION_TYPE_CODE: Dict[RelationType, int] = {t: i for i, t in enumerate(RelationType)}
+_TIME_KEY = itemgetter(0)
+
+_TEMPORAL_RELATION_CODES = frozenset(
+    _RELATION_TYPE_CODE[t] for t in (RelationType.HAPPENED_BEFORE, RelationType.HAPPENED_AFTER)
+)
+
+# 循环模式关键词（英文不区分大小写）
+_RECURRING_PATTERNS = [
+    ("每天", "daily"),
+    ("每日", "daily"),
+    ("每周", "weekly"),
+    ("每月", "monthly"),
+    ("每年", "yearly"),
+    ("every day", "daily"),
+    ("daily", "daily"),
+    ("every week", "weekly"),
+    ("weekly", "weekly"),
+    ("every month", "monthly"),
+    ("monthly", "monthly")
+]
+
+# 模糊时间关键词
+_FUZZY_PATTERNS = [
+    ("昨天", "yesterday"),
+    ("今天", "today"),
+    ("明天", "tomorrow"),
+    ("上周", "last week"),
+    ("下周", "next week"),
+    ("上个月", "last month"),
+    ("下个月", "next month"),
+    ("去年", "last year"),
+    ("明年", "next year")
+]
+
+# 命名分组 -> (类别, 优先级, 值)
+_TEMPORAL_GROUPS: Dict[str, Tuple[str, int, str]] = {
+    **{f"r{i}": ("recurring", i, v) for i, (_, v) in enumerate(_RECURRING_PATTERNS)},
+    **{f"f{i}": ("fuzzy", i, v) for i, (_, v) in enumerate(_FUZZY_PATTERNS)},
+}
+
+# 循环/模糊关键词与ISO日期时间合并为一个交替正则，一次扫描完成提取
+_TEMPORAL_RE = re.compile("|".join(
+    [f"(?P<r{i}>(?i:{re.escape(p)}))" for i, (p, _) in enumerate(_RECURRING_PATTERNS)]
+    + [f"(?P<f{i}>{re.escape(p)})" for i, (p, _) in enumerate(_FUZZY_PATTERNS)]
+    + [r"(?P<iso>\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?)"]
+))
+
+
+def _remove_sorted(index: List[tuple], key: datetime, entity_id: str):
+    """从按首元素有序的时间索引中移除指定实体的条目"""
+    i = bisect_left(index, key, key=_TIME_KEY)
+    while i < len(index) and index[i][0] == key:
+        if index[i][-1] == entity_id:
+            del index[i]
+            return
+        i += 1
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson 无法原生序列化的类型（集合）"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """
+    解析 isoformat() 写出的时间字符串，空值返回None
+    
+    datetime.fromisoformat 在 Python 3.11 中为 C 实现且可解析 isoformat() 的全部输出，
+    比按偏移切片再构造 datetime 的纯 Python 解析更快。
+    """
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass(slots=True, frozen=True)
 class TemporalInfo:
-    """时间信息数据类"""
+    """时间信息数据类（不可变，构造时预计算各时间点的 epoch 秒与 ISO 字符串）"""
     timestamp: Optional[datetime] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
@@ -59,12 +148,27 @@ class TemporalInfo:
     recurrence_pattern: Optional[str] = None  # 如 "daily", "weekly", "monthly"
     is_fuzzy: bool = False                    # 时间是否模糊
     fuzzy_description: Optional[str] = None   # 模糊时间描述，如 "上周", "去年"
+    _ts_epoch: Optional[float] = field(init=False, repr=False, compare=False)
+    _start_epoch: Optional[float] = field(init=False, repr=False, compare=False)
+    _end_epoch: Optional[float] = field(init=False, repr=False, compare=False)
+    _timestamp_iso: Optional[str] = field(init=False, repr=False, compare=False)
+    _start_time_iso: Optional[str] = field(init=False, repr=False, compare=False)
+    _end_time_iso: Optional[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "_ts_epoch", self.timestamp.timestamp() if self.timestamp else None)
+        object.__setattr__(self, "_start_epoch", self.start_time.timestamp() if self.start_time else None)
+        object.__setattr__(self, "_end_epoch", self.end_time.timestamp() if self.end_time else None)
+        # 同一个 TemporalInfo 常被一条记忆的所有实体共享，ISO 字符串只格式化一次
+        object.__setattr__(self, "_timestamp_iso", self.timestamp.isoformat() if self.timestamp else None)
+        object.__setattr__(self, "_start_time_iso", self.start_time.isoformat() if self.start_time else None)
+        object.__setattr__(self, "_end_time_iso", self.end_time.isoformat() if self.end_time else None)
     
     def to_dict(self) -> Dict:
         return {
-            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
-            "start_time": self.start_time.isoformat() if self.start_time else None,
-            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "timestamp": self._timestamp_iso,
+            "start_time": self._start_time_iso,
+            "end_time": self._end_time_iso,
             "is_recurring": self.is_recurring,
             "recurrence_pattern": self.recurrence_pattern,
             "is_fuzzy": self.is_fuzzy,
@@ -74,9 +178,9 @@ class TemporalInfo:
     @classmethod
     def from_dict(cls, data: Dict) -> "TemporalInfo":
         return cls(
-            timestamp=datetime.fromisoformat(data["timestamp"]) if data.get("timestamp") else None,
-            start_time=datetime.fromisoformat(data["start_time"]) if data.get("start_time") else None,
-            end_time=datetime.fromisoformat(data["end_time"]) if data.get("end_time") else None,
+            timestamp=_parse_iso(data.get("timestamp")),
+            start_time=_parse_iso(data.get("start_time")),
+            end_time=_parse_iso(data.get("end_time")),
             is_recurring=data.get("is_recurring", False),
             recurrence_pattern=data.get("recurrence_pattern"),
             is_fuzzy=data.get("is_fuzzy", False),
@@ -84,7 +188,7 @@ class TemporalInfo:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Entity:
     """知识图谱实体"""
     id: str
@@ -96,14 +200,24 @@ class Entity:
     source_memory_id: Optional[str] = None
     confidence: float = 1.0
     created_at: Optional[datetime] = None
+    _type_code: int = field(init=False, repr=False, compare=False)
+    _alias_set: Set[str] = field(init=False, repr=False, compare=False)  # aliases 的去重集合
+    _created_at_iso: Optional[str] = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        if self.aliases is None:
-            self.aliases = []
+        self._type_code = _ENTITY_TYPE_CODE[self.type]
+        if isinstance(self.source_memory_id, str):
+            # 同一记忆产生的实体/关系共享同一个字符串对象
+            self.source_memory_id = sys.intern(self.source_memory_id)
+        # 复制一份，合并别名时原地追加不会影响调用方传入的列表
+        self.aliases = list(self.aliases) if self.aliases else []
+        self._alias_set = set(self.aliases)
         if self.properties is None:
             self.properties = {}
         if self.created_at is None:
             self.created_at = datetime.utcnow()
+        # created_at 创建后不再修改，导出时直接复用
+        self._created_at_iso = self.created_at.isoformat()
     
     def to_dict(self) -> Dict:
         return {
@@ -115,7 +229,7 @@ class Entity:
             "temporal_info": self.temporal_info.to_dict() if self.temporal_info else None,
             "source_memory_id": self.source_memory_id,
             "confidence": self.confidence,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self._created_at_iso
         }
     
     @classmethod
@@ -123,17 +237,17 @@ class Entity:
         return cls(
             id=data["id"],
             name=data["name"],
-            type=EntityType(data["type"]),
+            type=_ENTITY_TYPE_MAP[data["type"]],
             aliases=data.get("aliases", []),
             properties=data.get("properties", {}),
             temporal_info=TemporalInfo.from_dict(data["temporal_info"]) if data.get("temporal_info") else None,
             source_memory_id=data.get("source_memory_id"),
             confidence=data.get("confidence", 1.0),
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+            created_at=_parse_iso(data.get("created_at"))
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Relation:
     """知识图谱关系"""
     id: str
@@ -145,12 +259,19 @@ class Relation:
     source_memory_id: Optional[str] = None
     confidence: float = 1.0
     created_at: Optional[datetime] = None
+    _type_code: int = field(init=False, repr=False, compare=False)
+    _created_at_iso: Optional[str] = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
+        self._type_code = _RELATION_TYPE_CODE[self.relation_type]
+        if isinstance(self.source_memory_id, str):
+            self.source_memory_id = sys.intern(self.source_memory_id)
         if self.properties is None:
             self.properties = {}
         if self.created_at is None:
             self.created_at = datetime.utcnow()
+        # created_at 创建后不再修改，导出时直接复用
+        self._created_at_iso = self.created_at.isoformat()
     
     def to_dict(self) -> Dict:
         return {
@@ -162,7 +283,7 @@ class Relation:
             "temporal_info": self.temporal_info.to_dict() if self.temporal_info else None,
             "source_memory_id": self.source_memory_id,
             "confidence": self.confidence,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self._created_at_iso
         }
     
     @classmethod
@@ -171,12 +292,12 @@ class Relation:
             id=data["id"],
             source_id=data["source_id"],
             target_id=data["target_id"],
-            relation_type=RelationType(data["relation_type"]),
+            relation_type=_RELATION_TYPE_MAP[data["relation_type"]],
             properties=data.get("properties", {}),
             temporal_info=TemporalInfo.from_dict(data["temporal_info"]) if data.get("temporal_info") else None,
             source_memory_id=data.get("source_memory_id"),
             confidence=data.get("confidence", 1.0),
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+            created_at=_parse_iso(data.get("created_at"))
         )
 
 
@@ -186,13 +307,26 @@ class TemporalKG:
     def __init__(self):
         self.entities: Dict[str, Entity] = {}
         self.relations: Dict[str, Relation] = {}
-        self.entity_relations: Dict[str, Set[str]] = {}  # entity_id -> relation_ids
-        self._counter = 0
+        # 出边/入边邻接表：entity_id -> [(另一端 entity_id, relation_id, 关系类型编码)]
+        self._out: Dict[str, List[Tuple[str, str, int]]] = defaultdict(list)
+        self._in: Dict[str, List[Tuple[str, str, int]]] = defaultdict(list)
+        self._pending_relations: List[Relation] = []  # 尚未登记到邻接表的关系，首次查询时再登记
+        self._name_index: Dict[str, str] = {}  # 小写名称/别名 -> entity_id
+        self._timeline: List[Tuple[datetime, str]] = []  # 按时间戳有序的 (timestamp, entity_id)
+        self._intervals: List[Tuple[datetime, datetime, str]] = []  # 按开始时间有序的 (start, end, entity_id)
+        self._id_counter = count(1)
+        self._ts_cache: Tuple[int, str] = (0, "")  # (UTC 秒, 格式化后的时间戳)
     
     def _generate_id(self, prefix: str) -> str:
         """生成唯一ID"""
-        self._counter += 1
-        return f"{prefix}_{self._counter}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+        return f"{prefix}_{next(self._id_counter)}_{self._id_timestamp()}"
+    
+    def _id_timestamp(self) -> str:
+        """ID 中的 UTC 时间戳部分，同一秒内复用格式化结果"""
+        now_s = int(time.time())
+        if now_s != self._ts_cache[0]:
+            self._ts_cache = (now_s, time.strftime("%Y%m%d%H%M%S", time.gmtime(now_s)))
+        return self._ts_cache[1]
     
     def add_entity(
         self,
@@ -213,13 +347,7 @@ class TemporalKG:
         # 检查是否已存在相同名称的实体
         existing = self.find_entity_by_name(name)
         if existing:
-            # 合并信息
-            existing.aliases = list(set(existing.aliases + (aliases or [])))
-            if properties:
-                existing.properties.update(properties)
-            if temporal_info and not existing.temporal_info:
-                existing.temporal_info = temporal_info
-            existing.confidence = max(existing.confidence, confidence)
+            self._merge_entity(existing, aliases, properties, temporal_info, confidence)
             return existing
         
         entity = Entity(
@@ -232,13 +360,93 @@ class TemporalKG:
             source_memory_id=source_memory_id,
             confidence=confidence
         )
-        
-        self.entities[entity.id] = entity
-        self.entity_relations[entity.id] = set()
+        self._register_entity(entity)
         
         logger.debug(f"Added entity: {name} ({entity_type.value})")
         return entity
     
+    def add_entities(
+        self,
+        specs: List[Dict],
+        temporal_info: Optional[TemporalInfo] = None,
+        source_memory_id: Optional[str] = None,
+        default_confidence: float = 1.0
+    ) -> List[Entity]:
+        """
+        批量添加实体，同名实体（包括批内重复）按 add_entity 的规则合并
+        
+        Args:
+            specs: 实体数据列表 [{"name": "...", "type": "...", "aliases": [...], ...}]
+            temporal_info: 所有实体共用的时间信息
+            source_memory_id: 来源记忆ID
+            default_confidence: 未指定 confidence 时的置信度
+            
+        Returns:
+            List[Entity]: 与 specs 一一对应的实体
+        """
+        # 整批共用一个 ID 时间戳，计数器保证唯一
+        id_suffix = self._id_timestamp()
+        results = []
+        created = 0
+        
+        for spec in specs:
+            type_value = spec.get("type", "concept").lower()
+            entity_type = _ENTITY_TYPE_MAP.get(type_value) or EntityType(type_value)
+            aliases = spec.get("aliases", [])
+            properties = spec.get("properties", {})
+            confidence = spec.get("confidence", default_confidence)
+            
+            existing = self.find_entity_by_name(spec["name"])
+            if existing:
+                self._merge_entity(existing, aliases, properties, temporal_info, confidence)
+                results.append(existing)
+                continue
+            
+            entity = Entity(
+                id=f"ent_{next(self._id_counter)}_{id_suffix}",
+                name=spec["name"],
+                type=entity_type,
+                aliases=aliases or [],
+                properties=properties or {},
+                temporal_info=temporal_info,
+                source_memory_id=source_memory_id,
+                confidence=confidence
+            )
+            self._register_entity(entity)
+            results.append(entity)
+            created += 1
+        
+        logger.debug(f"Added {created} entities in batch of {len(specs)}")
+        return results
+    
+    def _merge_entity(
+        self,
+        existing: Entity,
+        aliases: Optional[List[str]],
+        properties: Optional[Dict],
+        temporal_info: Optional[TemporalInfo],
+        confidence: float
+    ):
+        """将新信息合并到已存在的同名实体"""
+        if aliases:
+            # 只追加新别名，不重建整个列表
+            new_aliases = [a for a in dict.fromkeys(aliases) if a not in existing._alias_set]
+            existing._alias_set.update(new_aliases)
+            existing.aliases.extend(new_aliases)
+            self._index_names(existing.id, new_aliases)
+        if properties:
+            existing.properties.update(properties)
+        if temporal_info and not existing.temporal_info:
+            existing.temporal_info = temporal_info
+            self._index_time(existing)
+        existing.confidence = max(existing.confidence, confidence)
+    
+    def _register_entity(self, entity: Entity):
+        """登记新实体并更新名称/时间索引"""
+        self.entities[entity.id] = entity
+        self._index_names(entity.id, [entity.name] + entity.aliases)
+        self._index_time(entity)
+    
     def add_relation(
         self,
         source_id: str,
@@ -271,31 +479,109 @@ class TemporalKG:
         )
         
         self.relations[relation.id] = relation
-        self.entity_relations[source_id].add(relation.id)
-        self.entity_relations[target_id].add(relation.id)
+        self._pending_relations.append(relation)
         
         logger.debug(f"Added relation: {relation_type.value} from {source_id} to {target_id}")
         return relation
     
+    def remove_entity(self, entity_id: str) -> Optional[Entity]:
+        """
+        从知识图谱移除实体及其关联的关系
+        
+        Returns:
+            Entity: 被移除的实体，不存在则返回None
+        """
+        entity = self.entities.pop(entity_id, None)
+        if not entity:
+            return None
+        
+        freed = {
+            key for key in [entity.name.lower()] + [alias.lower() for alias in entity.aliases]
+            if self._name_index.get(key) == entity_id
+        }
+        for key in freed:
+            self._name_index.pop(key)
+        if freed:
+            # 被移除实体占用的键可能遮蔽了同名/同别名的后登记实体：
+            # 按插入顺序重新指向第一个匹配的实体，与原先线性扫描的查找结果一致
+            for other in self.entities.values():
+                for n in [other.name] + other.aliases:
+                    key = n.lower()
+                    if key in freed:
+                        self._name_index.setdefault(key, other.id)
+        
+        ti = entity.temporal_info
+        if ti and ti.timestamp:
+            _remove_sorted(self._timeline, ti.timestamp, entity_id)
+        if ti and ti.start_time and ti.end_time:
+            _remove_sorted(self._intervals, ti.start_time, entity_id)
+        
+        self._ensure_adjacency()
+        for other_id, rid, _ in self._out.pop(entity_id, []):
+            self.relations.pop(rid, None)
+            if other_id in self._in:
+                self._in[other_id] = [t for t in self._in[other_id] if t[1] != rid]
+        
+        for other_id, rid, _ in self._in.pop(entity_id, []):
+            self.relations.pop(rid, None)
+            if other_id in self._out:
+                self._out[other_id] = [t for t in self._out[other_id] if t[1] != rid]
+        
+        return entity
+    
+    def _ensure_adjacency(self):
+        """把待登记的关系写入邻接表；只写入不查询的场景（批量构建后直接导出）不承担这部分开销"""
+        if self._pending_relations:
+            for relation in self._pending_relations:
+                self._link_relation(relation)
+            self._pending_relations.clear()
+    
+    def _link_relation(self, relation: Relation):
+        """将关系登记到出边/入边邻接表（自环只记一次）"""
+        type_code = relation._type_code
+        self._out[relation.source_id].append((relation.target_id, relation.id, type_code))
+        if relation.target_id != relation.source_id:
+            self._in[relation.target_id].append((relation.source_id, relation.id, type_code))
+    
+    @property
+    def entity_relations(self) -> Dict[str, Set[str]]:
+        """entity_id -> relation_ids 视图，直接由关系生成，不依赖邻接表"""
+        result: Dict[str, Set[str]] = {eid: set() for eid in self.entities}
+        for relation in self.relations.values():
+            result.setdefault(relation.source_id, set()).add(relation.id)
+            result.setdefault(relation.target_id, set()).add(relation.id)
+        return result
+    
+    def _index_time(self, entity: Entity):
+        """将带时间戳/时间段的实体插入时间索引，同一时间按登记顺序排列"""
+        ti = entity.temporal_info
+        if ti and ti.timestamp:
+            insort(self._timeline, (ti.timestamp, entity.id), key=_TIME_KEY)
+        if ti and ti.start_time and ti.end_time:
+            insort(self._intervals, (ti.start_time, ti.end_time, entity.id), key=_TIME_KEY)
+    
+    def _index_names(self, entity_id: str, names: List[str]):
+        """将名称/别名登记到名称索引，已被占用的键保持指向先登记的实体"""
+        for n in names:
+            self._name_index.setdefault(n.lower(), entity_id)
+    
     def find_entity_by_name(self, name: str) -> Optional[Entity]:
         """通过名称查找实体"""
-        name_lower = name.lower()
-        for entity in self.entities.values():
-            if entity.name.lower() == name_lower:
-                return entity
-            if any(alias.lower() == name_lower for alias in entity.aliases):
-                return entity
-        return None
+        entity_id = self._name_index.get(name.lower())
+        if entity_id is None:
+            return None
+        return self.entities.get(entity_id)
     
     def find_entities_by_type(self, entity_type: EntityType) -> List[Entity]:
         """通过类型查找实体"""
-        return [e for e in self.entities.values() if e.type == entity_type]
+        type_code = _ENTITY_TYPE_CODE[entity_type]
+        return [e for e in self.entities.values() if e._type_code == type_code]
     
     def get_entity_relations(self, entity_id: str) -> List[Relation]:
         """获取实体的所有关系"""
-        if entity_id not in self.entity_relations:
-            return []
-        return [self.relations[rid] for rid in self.entity_relations[entity_id]]
+        self._ensure_adjacency()
+        edges = chain(self._out.get(entity_id, ()), self._in.get(entity_id, ()))
+        return [self.relations[rid] for _, rid, _ in edges]
     
     def get_related_entities(self, entity_id: str, relation_type: Optional[RelationType] = None) -> List[Tuple[Entity, Relation]]:
         """
@@ -304,20 +590,18 @@ class TemporalKG:
         Returns:
             List[Tuple[Entity, Relation]]: (相关实体, 关系)列表
         """
-        relations = self.get_entity_relations(entity_id)
+        self._ensure_adjacency()
+        type_code = _RELATION_TYPE_CODE[relation_type] if relation_type else None
+        edges = chain(self._out.get(entity_id, ()), self._in.get(entity_id, ()))
         results = []
         
-        for rel in relations:
-            if relation_type and rel.relation_type != relation_type:
+        for other_id, rid, rel_code in edges:
+            if type_code is not None and rel_code != type_code:
                 continue
             
-            if rel.source_id == entity_id:
-                related_entity = self.entities.get(rel.target_id)
-            else:
-                related_entity = self.entities.get(rel.source_id)
-            
+            related_entity = self.entities.get(other_id)
             if related_entity:
-                results.append((related_entity, rel))
+                results.append((related_entity, self.relations[rid]))
         
         return results
     
@@ -327,65 +611,45 @@ class TemporalKG:
         
         这是一个简单实现，实际应用中可能需要更复杂的NLP
         """
-        temporal_info = TemporalInfo()
-        text_lower = text.lower()
-        
-        # 检测循环模式
-        recurring_patterns = {
-            "每天": "daily",
-            "每日": "daily",
-            "每周": "weekly",
-            "每月": "monthly",
-            "每年": "yearly",
-            "every day": "daily",
-            "daily": "daily",
-            "every week": "weekly",
-            "weekly": "weekly",
-            "every month": "monthly",
-            "monthly": "monthly"
-        }
-        
-        for pattern, recurrence in recurring_patterns.items():
-            if pattern in text_lower:
-                temporal_info.is_recurring = True
-                temporal_info.recurrence_pattern = recurrence
-                break
+        recurring_rank = fuzzy_rank = None
+        recurrence_pattern = fuzzy_description = None
+        iso_str = None
+        timestamp = None
+        
+        # 单次扫描，同类命中多个时按关键词表顺序取优先者，与逐个 in 检测结果一致
+        for match in _TEMPORAL_RE.finditer(text):
+            group = match.lastgroup
+            if group == "iso":
+                if iso_str is None:
+                    iso_str = match.group()
+                continue
+            
+            kind, rank, value = _TEMPORAL_GROUPS[group]
+            if kind == "recurring":
+                if recurring_rank is None or rank < recurring_rank:
+                    recurring_rank = rank
+                    recurrence_pattern = value
+            elif fuzzy_rank is None or rank < fuzzy_rank:
+                fuzzy_rank = rank
+                fuzzy_description = value
         
-        # 检测具体时间
         # ISO格式日期时间
-        iso_pattern = r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?'
-        iso_matches = re.findall(iso_pattern, text)
-        
-        if iso_matches:
+        if iso_str:
             try:
-                date_str = iso_matches[0]
-                if 'T' in date_str:
-                    temporal_info.timestamp = datetime.fromisoformat(date_str)
+                if 'T' in iso_str:
+                    timestamp = datetime.fromisoformat(iso_str)
                 else:
-                    temporal_info.timestamp = datetime.strptime(date_str, "%Y-%m-%d")
+                    timestamp = datetime.strptime(iso_str, "%Y-%m-%d")
             except:
                 pass
         
-        # 模糊时间
-        fuzzy_patterns = {
-            "昨天": "yesterday",
-            "今天": "today",
-            "明天": "tomorrow",
-            "上周": "last week",
-            "下周": "next week",
-            "上个月": "last month",
-            "下个月": "next month",
-            "去年": "last year",
-            "明年": "next year"
-        }
-        
-        for pattern, description in fuzzy_patterns.items():
-            if pattern in text:
-                temporal_info.is_fuzzy = True
-                temporal_info.fuzzy_description = description
-                break
-        
-        return temporal_info
+        return TemporalInfo(
+            timestamp=timestamp,
+            is_recurring=recurring_rank is not None,
+            recurrence_pattern=recurrence_pattern,
+            is_fuzzy=fuzzy_rank is not None,
+            fuzzy_description=fuzzy_description
+        )
     
     def build_from_memory(self, memory_id: str, content: str, entities_data: List[Dict]) -> List[Entity]:
         """
@@ -399,24 +663,16 @@ class TemporalKG:
         Returns:
             List[Entity]: 创建的实体列表
         """
-        created_entities = []
-        
         # 提取时间信息
         temporal_info = self.extract_temporal_info(content)
         
         # 创建实体
-        for ent_data in entities_data:
-            entity_type = EntityType(ent_data.get("type", "concept").lower())
-            entity = self.add_entity(
-                name=ent_data["name"],
-                entity_type=entity_type,
-                aliases=ent_data.get("aliases", []),
-                properties=ent_data.get("properties", {}),
-                temporal_info=temporal_info,
-                source_memory_id=memory_id,
-                confidence=ent_data.get("confidence", 0.8)
-            )
-            created_entities.append(entity)
+        created_entities = self.add_entities(
+            entities_data,
+            temporal_info=temporal_info,
+            source_memory_id=memory_id,
+            default_confidence=0.8
+        )
         
         # 创建实体间的关系（简单实现：相邻实体间创建相关关系）
         for i in range(len(created_entities) - 1):
@@ -446,23 +702,26 @@ class TemporalKG:
         Returns:
             List[Entity]: 符合条件的实体
         """
-        results = []
+        hits: Dict[str, None] = {}
         
-        for entity in self.entities.values():
-            if entity_type and entity.type != entity_type:
-                continue
-            
-            if not entity.temporal_info:
-                continue
-            
-            ti = entity.temporal_info
-            
-            # 检查时间重叠
-            if ti.timestamp and start <= ti.timestamp <= end:
+        # 时间戳落在范围内：在有序时间线上二分定位
+        lo = bisect_left(self._timeline, start, key=_TIME_KEY)
+        hi = bisect_right(self._timeline, end, key=_TIME_KEY)
+        for _, entity_id in self._timeline[lo:hi]:
+            hits[entity_id] = None
+        
+        # 时间段重叠：只需检查开始时间不晚于 end 的区间
+        hi = bisect_right(self._intervals, end, key=_TIME_KEY)
+        for _, end_time, entity_id in self._intervals[:hi]:
+            if end_time >= start:
+                hits[entity_id] = None
+        
+        type_code = _ENTITY_TYPE_CODE[entity_type] if entity_type else None
+        results = []
+        for entity_id in hits:
+            entity = self.entities[entity_id]
+            if type_code is None or entity._type_code == type_code:
                 results.append(entity)
-            elif ti.start_time and ti.end_time:
-                if not (ti.end_time < start or ti.start_time > end):
-                    results.append(entity)
         
         return results
     
@@ -478,7 +737,7 @@ class TemporalKG:
         all_relations = self.get_entity_relations(entity_id)
         
         for rel in all_relations:
-            if rel.relation_type in [RelationType.HAPPENED_BEFORE, RelationType.HAPPENED_AFTER]:
+            if rel._type_code in _TEMPORAL_RELATION_CODES:
                 temporal_relations.append(rel)
             elif rel.temporal_info:
                 # 检查关系的时间信息
@@ -506,22 +765,18 @@ class TemporalKG:
         ti2 = ent2.temporal_info
         
         # 使用具体时间戳
-        if ti1.timestamp and ti2.timestamp:
-            if ti1.timestamp < ti2.timestamp:
-                return "before"
-            elif ti1.timestamp > ti2.timestamp:
-                return "after"
-            else:
-                return "concurrent"
+        a, b = ti1._ts_epoch, ti2._ts_epoch
+        if a is not None and b is not None:
+            return "before" if a < b else ("after" if a > b else "concurrent")
         
         # 使用时间段
-        if ti1.end_time and ti2.start_time:
-            if ti1.end_time <= ti2.start_time:
-                return "before"
+        end1, start2 = ti1._end_epoch, ti2._start_epoch
+        if end1 is not None and start2 is not None and end1 <= start2:
+            return "before"
         
-        if ti2.end_time and ti1.start_time:
-            if ti2.end_time <= ti1.start_time:
-                return "after"
+        end2, start1 = ti2._end_epoch, ti1._start_epoch
+        if end2 is not None and start1 is not None and end2 <= start1:
+            return "after"
         
         return None
     
@@ -532,19 +787,21 @@ class TemporalKG:
         Returns:
             List[Entity]: 按时间排序的实体
         """
-        entities_with_time = []
+        type_code = _ENTITY_TYPE_CODE[entity_type] if entity_type else None
+        results = []
         
-        for entity in self.entities.values():
-            if entity_type and entity.type != entity_type:
+        # 时间线索引已有序，取满 limit 即可停止
+        for _, entity_id in self._timeline:
+            if len(results) >= limit:
+                break
+            
+            entity = self.entities[entity_id]
+            if type_code is not None and entity._type_code != type_code:
                 continue
             
-            if entity.temporal_info and entity.temporal_info.timestamp:
-                entities_with_time.append((entity, entity.temporal_info.timestamp))
-        
-        # 按时间排序
-        entities_with_time.sort(key=lambda x: x[1])
+            results.append(entity)
         
-        return [e[0] for e in entities_with_time[:limit]]
+        return results
     
     def to_dict(self) -> Dict:
         """导出为字典"""
@@ -561,20 +818,31 @@ class TemporalKG:
         
         for ent_data in data.get("entities", {}).values():
             entity = Entity.from_dict(ent_data)
-            kg.entities[entity.id] = entity
+            kg._register_entity(entity)
         
         for rel_data in data.get("relations", {}).values():
             relation = Relation.from_dict(rel_data)
             kg.relations[relation.id] = relation
-        
-        for ent_id, rel_ids in data.get("entity_relations", {}).items():
-            kg.entity_relations[ent_id] = set(rel_ids)
+            kg._pending_relations.append(relation)
         
         return kg
     
     def to_json(self) -> str:
         """导出为JSON字符串"""
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        # orjson 直接序列化 dataclass / Enum / datetime，跳过 to_dict() 的中间字典
+        try:
+            return orjson.dumps(
+                {
+                    "entities": self.entities,
+                    "relations": self.relations,
+                    "entity_relations": self.entity_relations
+                },
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            # orjson.JSONEncodeError 是 TypeError 的子类，如超出 64 位的整数
+            return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
     
     @classmethod
     def from_json(cls, json_str: str) -> "TemporalKG":
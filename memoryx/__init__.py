@@ -6,6 +6,6 @@ MemoryX Python SDK
 __version__ = "1.0.4"
 __author__ = "MemoryX Team"
 
-from .client import MemoryXClient, connect_memory
+from .client import MemoryXClient, connect_memory, fast_connect
 
-__all__ = ["MemoryXClient", "connect_memory"]
+__all__ = ["MemoryXClient", "connect_memory", "fast_connect"]
@@ -4,11 +4,153 @@ MemoryX Client - 核心客户端
 
 import json
 import hashlib
-import platform
-import uuid
-from typing import Optional, List, Dict, Any
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+import http.client
+import os
+import select
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import urlencode, urlsplit
+
+try:
+    import orjson
+    
+    # orjson 直接输出/接受 bytes，省去 encode/decode 两步
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+    
+    def _dumps_indent(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:  # orjson 为可选依赖，未安装时退回标准库
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    
+    def _dumps_indent(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+    
+    _loads = json.loads
+
+
+# OpenClaw Hook 模板，模块加载时编码一次，安装时直接写 bytes
+_HOOK_MD = """# MemoryX OpenClaw Hook
+name: memoryx-sync
+version: 1.0.0
+entry: handler.py
+author: MemoryX Team
+description: 自动同步重要记忆到 MemoryX
+requirements:
+  - t0ken-memoryx>=1.0.3
+""".encode()
+
+_HANDLER_PY = """#!/usr/bin/env python3
+import os
+
+def on_message(message, context):
+    if len(message) < 5:
+        return {}
+    
+    try:
+        from memoryx import connect_memory
+        memory = connect_memory(verbose=False)
+        
+        # 搜索相关记忆
+        results = memory.search(message, limit=3)
+        if results.get('data'):
+            context['memoryx_context'] = results['data']
+        
+        # 简单筛选
+        keywords = ['记住', '我是', '我喜欢', '纠正', '昨天', '计划']
+        if any(k in message for k in keywords):
+            memory.add(message)
+            print(f"💾 已自动记忆")
+            
+    except Exception as e:
+        pass
+    
+    return {'context': context}
+
+def on_response(response, context):
+    return response
+""".encode()
+
+
+@lru_cache(maxsize=1)
+def _machine_fingerprint() -> str:
+    """生成机器指纹（基于硬件信息，不含 hostname）
+    
+    结果在进程内不变，缓存后 platform.processor()、uuid.getnode() 只执行一次
+    """
+    # platform / uuid 只在这里用到，延迟导入以缩短 import memoryx 的时间
+    import platform
+    import uuid
+    
+    # 基于硬件信息生成唯一标识
+    # 注意：不含 hostname，避免系统重命名导致指纹变化
+    machine_info = {
+        "platform": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or "unknown",
+        "mac": hex(uuid.getnode()),
+    }
+    fingerprint_str = json.dumps(machine_info, sort_keys=True)
+    return hashlib.sha256(fingerprint_str.encode()).hexdigest()[:32]
+
+
+# 连接断开后可安全重发的方法：重复执行不会产生额外副作用
+_RETRY_SAFE_METHODS = frozenset(("GET", "DELETE"))
+
+
+def _open_connection(base_url: str) -> Tuple[http.client.HTTPConnection, str, Dict[str, str]]:
+    """
+    按 base_url 创建连接，返回 (连接, 请求路径前缀, 代理请求头)
+    
+    与 urllib 一致读取 HTTP(S)_PROXY / NO_PROXY：https 经代理 CONNECT 隧道，
+    http 直接向代理发送绝对 URL。
+    """
+    # 只在建连时用到，延迟导入（urllib.request 导入较慢）
+    import urllib.request
+    from base64 import b64encode
+    from urllib.parse import unquote
+    
+    parts = urlsplit(base_url)
+    is_https = parts.scheme == "https"
+    conn_cls = http.client.HTTPSConnection if is_https else http.client.HTTPConnection
+    path_prefix = parts.path.rstrip("/")
+    
+    proxy = urllib.request.getproxies().get(parts.scheme)
+    if not proxy or urllib.request.proxy_bypass(parts.hostname):
+        return conn_cls(parts.hostname, parts.port, timeout=30), path_prefix, {}
+    
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    proxy_parts = urlsplit(proxy)
+    proxy_headers = {}
+    if proxy_parts.username:
+        credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+        proxy_headers["Proxy-Authorization"] = "Basic " + b64encode(credentials.encode()).decode()
+    
+    conn = conn_cls(proxy_parts.hostname, proxy_parts.port, timeout=30)
+    if is_https:
+        conn.set_tunnel(parts.hostname, parts.port, headers=proxy_headers)
+        return conn, path_prefix, {}
+    return conn, f"http://{parts.netloc}{path_prefix}", proxy_headers
+
+
+def _connection_dropped(conn: http.client.HTTPConnection) -> bool:
+    """空闲连接上有可读事件（对端已关闭或发来了意外数据）时视为不可复用"""
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+@lru_cache(maxsize=4)
+def _read_config_cached(path: str, mtime_ns: int) -> dict:
+    """解析配置文件；以修改时间为缓存键，文件改动后自动失效（返回值勿修改）"""
+    with open(path, "rb") as f:
+        return _loads(f.read())
 
 
 class MemoryXClient:
@@ -16,6 +158,17 @@ class MemoryXClient:
     
     DEFAULT_BASE_URL = "https://t0ken.ai/api"
     
+    # 服务端 /v1/memories/batch 单次最多接受的条数
+    MAX_BATCH_SIZE = 200
+    
+    # add(dedup=True) 记住的最近提交条数
+    DEDUP_CACHE_SIZE = 512
+    
+    _BASE_HEADERS = {
+        "Content-Type": "application/json",
+        "User-Agent": "memoryx-python/1.0.0"
+    }
+    
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         初始化 MemoryX 客户端
@@ -28,47 +181,102 @@ class MemoryXClient:
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self.machine_fingerprint = self._generate_fingerprint()
         
+        # 持久连接（Keep-Alive），多次调用复用同一个 TCP/TLS 连接
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._conn_base_url: Optional[str] = None
+        self._path_prefix = ""
+        self._proxy_headers: Dict[str, str] = {}
+        self._conn_lock = threading.Lock()
+        
+        # add(dedup=True) 的最近提交：payload 摘要 -> 服务端响应，按最近使用排序
+        self._recent_adds: "OrderedDict[bytes, dict]" = OrderedDict()
+        
+        self._headers: Dict[str, str] = {}
+        self._headers_api_key: Optional[str] = None
+        self._rebuild_headers()
+        
     def _generate_fingerprint(self) -> str:
         """生成机器指纹（基于硬件信息，不含 hostname）"""
-        # 基于硬件信息生成唯一标识
-        # 注意：不含 hostname，避免系统重命名导致指纹变化
-        machine_info = {
-            "platform": platform.system(),
-            "machine": platform.machine(),
-            "processor": platform.processor() or "unknown",
-            "mac": hex(uuid.getnode()),
-        }
-        fingerprint_str = json.dumps(machine_info, sort_keys=True)
-        return hashlib.sha256(fingerprint_str.encode()).hexdigest()[:32]
+        return _machine_fingerprint()
+    
+    def _get_connection(self) -> http.client.HTTPConnection:
+        """获取持久连接；base_url 变化（如加载配置后）时重建"""
+        if self._conn is None or self._conn_base_url != self.base_url:
+            self.close()
+            self._conn, self._path_prefix, self._proxy_headers = _open_connection(self.base_url)
+            self._conn_base_url = self.base_url
+        elif self._conn.sock is not None and _connection_dropped(self._conn):
+            # 服务端已关闭空闲连接：发送前断开，下次请求自动重连
+            self._conn.close()
+        return self._conn
+    
+    def close(self):
+        """关闭持久连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _rebuild_headers(self):
+        """按当前 api_key 重建请求头，请求时直接复用"""
+        headers = dict(self._BASE_HEADERS)
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        self._headers = headers
+        self._headers_api_key = self.api_key
     
     def _request(self, method: str, endpoint: str, data: Optional[dict] = None) -> dict:
         """发送 HTTP 请求"""
-        url = f"{self.base_url}{endpoint}"
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": f"memoryx-python/1.0.0"
-        }
+        # api_key 可能在注册、加载配置或由调用方直接赋值后变化
+        if self._headers_api_key != self.api_key:
+            self._rebuild_headers()
+        headers = self._headers
         
-        if self.api_key:
-            headers["X-API-Key"] = self.api_key
-            
-        req = Request(
-            url,
-            data=json.dumps(data).encode() if data else None,
-            headers=headers,
-            method=method
-        )
+        body = _dumps(data) if data else None
         
         try:
-            with urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode())
-        except HTTPError as e:
-            error_body = e.read().decode()
+            with self._conn_lock:
+                conn = self._get_connection()
+                if self._proxy_headers:
+                    headers = {**headers, **self._proxy_headers}
+                path = self._path_prefix + endpoint
+                # sock 非空说明复用的是已有的 Keep-Alive 连接
+                reused = conn.sock is not None
+                sent = False
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    sent = True
+                    response = conn.getresponse()
+                except (http.client.BadStatusLine, ConnectionError):
+                    # 复用连接在收到响应前断开时重连重试一次；请求已发出的 POST 不重发，
+                    # 服务端可能已经处理过，重发会重复写入记忆
+                    if not reused or (sent and method not in _RETRY_SAFE_METHODS):
+                        raise
+                    conn.close()
+                    conn.request(method, path, body=body, headers=headers)
+                    response = conn.getresponse()
+                status = response.status
+                raw = response.read()
+        except Exception as e:
+            self.close()
+            raise MemoryXError(f"Request failed: {str(e)}")
+        
+        if status >= 400:
+            # 直接解析 bytes；只有非 JSON 错误体才解码成文本放进异常信息
             try:
-                error_data = json.loads(error_body)
-                raise MemoryXError(error_data.get("message", f"HTTP {e.code}"))
+                error_data = _loads(raw)
             except json.JSONDecodeError:
-                raise MemoryXError(f"HTTP {e.code}: {error_body}")
+                raise MemoryXError(f"HTTP {status}: {raw.decode('utf-8', 'replace')}")
+            # FastAPI 的错误信息在 detail 字段
+            raise MemoryXError(error_data.get("detail") or error_data.get("message") or f"HTTP {status}")
+        
+        try:
+            return _loads(raw)
         except Exception as e:
             raise MemoryXError(f"Request failed: {str(e)}")
     
@@ -79,6 +287,9 @@ class MemoryXClient:
         Returns:
             注册结果，包含 api_key, user_id 等
         """
+        import platform
+        import socket
+        
         data = {
             "machine_fingerprint": self.machine_fingerprint,
             "platform": platform.system().lower(),
@@ -101,9 +312,6 @@ class MemoryXClient:
         Returns:
             安装结果
         """
-        import os
-        import shutil
-        
         OPENCLAW_DIR = os.path.expanduser("~/.openclaw")
         HOOK_DIR = os.path.join(OPENCLAW_DIR, "hooks", "memoryx-sync")
         
@@ -125,72 +333,21 @@ class MemoryXClient:
         
         try:
             # 创建目录
-            os.makedirs(HOOK_DIR, exist_ok=True)
-            
-            # 写入 HOOK.md
-            with open(os.path.join(HOOK_DIR, "HOOK.md"), "w") as f:
-                f.write("""# MemoryX OpenClaw Hook
-name: memoryx-sync
-version: 1.0.0
-entry: handler.py
-author: MemoryX Team
-description: 自动同步重要记忆到 MemoryX
-requirements:
-  - t0ken-memoryx>=1.0.3
-""")
-            
-            # 写入 handler.py
-            with open(os.path.join(HOOK_DIR, "handler.py"), "w") as f:
-                f.write("""#!/usr/bin/env python3
-import os
-
-def on_message(message, context):
-    if len(message) < 5:
-        return {}
-    
-    try:
-        from memoryx import connect_memory
-        memory = connect_memory(verbose=False)
-        
-        # 搜索相关记忆
-        results = memory.search(message, limit=3)
-        if results.get('data'):
-            context['memoryx_context'] = results['data']
-        
-        # 简单筛选
-        keywords = ['记住', '我是', '我喜欢', '纠正', '昨天', '计划']
-        if any(k in message for k in keywords):
-            memory.add(message)
-            print(f"💾 已自动记忆")
+            hook_dir = Path(HOOK_DIR)
+            hook_dir.mkdir(parents=True, exist_ok=True)
             
-    except Exception as e:
-        pass
-    
-    return {'context': context}
-
-def on_response(response, context):
-    return response
-""")
+            # 模板在模块加载时已编码为 bytes，每个文件一次二进制写入
+            (hook_dir / "HOOK.md").write_bytes(_HOOK_MD)
+            (hook_dir / "handler.py").write_bytes(_HANDLER_PY)
             
             # 配置 OpenClaw
-            config_file = os.path.join(OPENCLAW_DIR, "openclaw.json")
-            config = {}
+            config_file = Path(OPENCLAW_DIR) / "openclaw.json"
+            config = _loads(config_file.read_bytes()) if config_file.exists() else {}
             
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
+            entries = config.setdefault('hooks', {}).setdefault('internal', {}).setdefault('entries', {})
+            entries['memoryx-sync'] = {'enabled': True}
             
-            if 'hooks' not in config:
-                config['hooks'] = {}
-            if 'internal' not in config['hooks']:
-                config['hooks']['internal'] = {}
-            if 'entries' not in config['hooks']['internal']:
-                config['hooks']['internal']['entries'] = {}
-            
-            config['hooks']['internal']['entries']['memoryx-sync'] = {'enabled': True}
-            
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            config_file.write_bytes(_dumps_indent(config))
             
             return {
                 "success": True,
@@ -210,7 +367,6 @@ def on_response(response, context):
 
     def _save_config(self):
         """保存配置到本地文件"""
-        import os
         config_dir = os.path.expanduser("~/.memoryx")
         os.makedirs(config_dir, exist_ok=True)
         
@@ -220,20 +376,31 @@ def on_response(response, context):
             "base_url": self.base_url
         }
         
-        with open(os.path.join(config_dir, "config.json"), "w") as f:
-            json.dump(config, f)
+        # 先写临时文件再原子替换，进程中途崩溃也不会留下半截的 config.json；
+        # 临时文件名唯一，多个进程同时首次注册时互不覆盖
+        import tempfile
+        
+        config_path = os.path.join(config_dir, "config.json")
+        fd, tmp_path = tempfile.mkstemp(dir=config_dir, prefix="config.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_dumps(config))
+            os.replace(tmp_path, config_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
     
     def _load_config(self) -> bool:
         """从本地文件加载配置"""
-        import os
         config_path = os.path.expanduser("~/.memoryx/config.json")
         
-        if not os.path.exists(config_path):
+        try:
+            st = os.stat(config_path)
+        except OSError:
             return False
             
         try:
-            with open(config_path, "r") as f:
-                config = json.load(f)
+            config = _read_config_cached(config_path, st.st_mtime_ns)
             
             # 验证机器指纹
             if config.get("machine_fingerprint") == self.machine_fingerprint:
@@ -246,7 +413,8 @@ def on_response(response, context):
         return False
     
     def add(self, content: str, category: str = "semantic", 
-            project_id: str = "default", metadata: Optional[dict] = None) -> dict:
+            project_id: str = "default", metadata: Optional[dict] = None,
+            dedup: bool = False) -> dict:
         """
         存储记忆
         
@@ -255,6 +423,8 @@ def on_response(response, context):
             category: 认知分类 (episodic/semantic/procedural/emotional/reflective)
             project_id: 项目 ID
             metadata: 额外元数据
+            dedup: 为 True 时，与最近 DEDUP_CACHE_SIZE 次内完全相同的提交
+                不再发请求，直接返回上次的结果
             
         Returns:
             存储结果
@@ -269,7 +439,62 @@ def on_response(response, context):
             "metadata": metadata or {}
         }
         
-        return self._request("POST", "/v1/memories", data)
+        if not dedup:
+            return self._request("POST", "/v1/memories", data)
+        
+        # 排序键后取 8 字节 BLAKE2b 摘要，metadata 键顺序不同也视为同一条
+        key = hashlib.blake2b(
+            json.dumps(data, sort_keys=True, default=str).encode(), digest_size=8
+        ).digest()
+        cached = self._recent_adds.get(key)
+        if cached is not None:
+            self._recent_adds.move_to_end(key)
+            return cached
+        
+        result = self._request("POST", "/v1/memories", data)
+        self._recent_adds[key] = result
+        if len(self._recent_adds) > self.DEDUP_CACHE_SIZE:
+            self._recent_adds.popitem(last=False)
+        return result
+    
+    def add_many(self, items: List[Any], project_id: str = "default") -> dict:
+        """
+        批量存储记忆
+        
+        通过 /v1/memories/batch 一次请求提交多条记忆，超过 MAX_BATCH_SIZE 时自动分批，
+        比逐条调用 add() 少 N-1 次网络往返
+        
+        Args:
+            items: 记忆列表，元素为内容字符串或 {"content": ..., "metadata": {...}}
+            project_id: 项目 ID
+            
+        Returns:
+            汇总结果，包含各批次的 task_ids 与 queued_count
+        """
+        if not self.api_key:
+            raise MemoryXError("Not registered. Call auto_register() first.")
+        
+        memories = [
+            {"content": item, "metadata": {}} if isinstance(item, str)
+            else {"content": item["content"], "metadata": item.get("metadata") or {}}
+            for item in items
+        ]
+        
+        task_ids = []
+        queued_count = 0
+        for start in range(0, len(memories), self.MAX_BATCH_SIZE):
+            result = self._request("POST", "/v1/memories/batch", {
+                "memories": memories[start:start + self.MAX_BATCH_SIZE],
+                "project_id": project_id
+            })
+            task_ids.append(result.get("task_id"))
+            queued_count += result.get("queued_count", 0)
+        
+        return {
+            "success": True,
+            "task_ids": task_ids,
+            "queued_count": queued_count
+        }
     
     def list(self, project_id: Optional[str] = None, 
              limit: int = 100, offset: int = 0) -> dict:
@@ -287,11 +512,11 @@ def on_response(response, context):
         if not self.api_key:
             raise MemoryXError("Not registered. Call auto_register() first.")
             
-        params = f"?limit={limit}&offset={offset}"
+        params = [("limit", limit), ("offset", offset)]
         if project_id:
-            params += f"&project_id={project_id}"
+            params.append(("project_id", project_id))
             
-        return self._request("GET", f"/v1/memories{params}")
+        return self._request("GET", f"/v1/memories/list?{urlencode(params)}")
     
     def search(self, query: str, project_id: Optional[str] = None,
                limit: int = 10) -> dict:
@@ -369,6 +594,10 @@ class MemoryXError(Exception):
     pass
 
 
+# connect_memory 返回的客户端按 base_url 缓存，同一进程重复调用不再读配置、装 Hook
+_client_cache: Dict[Optional[str], MemoryXClient] = {}
+
+
 def connect_memory(base_url: Optional[str] = None, verbose: bool = True, 
                    auto_install_hook: bool = True) -> MemoryXClient:
     """
@@ -376,6 +605,8 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True,
     
     自动检测本地配置，如果没有则自动注册
     默认自动安装 OpenClaw Hook（如果检测到 OpenClaw）
+    同一 base_url 在进程内只初始化一次，之后直接返回缓存的实例
+    （测试中可调用 connect_memory.cache_clear() 清空）
     
     Args:
         base_url: API 基础 URL（可选）
@@ -391,6 +622,10 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True,
         >>> memory.add("用户喜欢深色模式")
         >>> results = memory.search("用户偏好")
     """
+    client = _client_cache.get(base_url)
+    if client is not None:
+        return client
+    
     client = MemoryXClient(base_url=base_url)
     
     is_new_registration = False
@@ -431,9 +666,37 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True,
     if verbose:
         _print_usage_guide(is_new_registration)
     
+    _client_cache[base_url] = client
     return client
 
 
+connect_memory.cache_clear = _client_cache.clear
+
+
+def fast_connect(base_url: Optional[str] = None) -> MemoryXClient:
+    """
+    服务端/库集成用的快速连接：不打印任何内容，不安装 OpenClaw Hook
+    
+    设置了环境变量 MEMORYX_API_KEY 时直接用它构造客户端，
+    不读本地配置，也不会触发自动注册
+    
+    Args:
+        base_url: API 基础 URL（可选）
+        
+    Returns:
+        MemoryXClient 实例
+        
+    Example:
+        >>> from memoryx import fast_connect
+        >>> memory = fast_connect()
+        >>> memory.add("用户喜欢深色模式")
+    """
+    api_key = os.environ.get("MEMORYX_API_KEY")
+    if api_key:
+        return MemoryXClient(api_key=api_key, base_url=base_url)
+    return connect_memory(base_url=base_url, verbose=False, auto_install_hook=False)
+
+
 def _print_usage_guide(is_new: bool = False):
     """打印使用指南，帮助 Agent 了解如何同步记忆"""
     guide = """
@@ -6,19 +6,26 @@
 Object.defineProperty(exports, "__esModule", { value: true });
 exports.onMessage = onMessage;
 exports.onResponse = onResponse;
+// Cached result of the plugin check (null = not checked yet)
+let pluginInstalled = null;
 // Check if memoryx-realtime-plugin is installed
+// Runs `openclaw plugins list` once per process instead of on every message
 function isPluginInstalled() {
+    if (pluginInstalled !== null) {
+        return pluginInstalled;
+    }
     try {
         const { execSync } = require('child_process');
         const result = execSync('openclaw plugins list', {
             encoding: 'utf8',
             timeout: 5000
         });
-        return result.includes('memoryx-realtime') && result.includes('loaded');
+        pluginInstalled = result.includes('memoryx-realtime') && result.includes('loaded');
     }
     catch (e) {
-        return false;
+        pluginInstalled = false;
     }
+    return pluginInstalled;
 }
 // Check if t0ken-memoryx is available
 const MEMORYX_AVAILABLE = (() => {
@@ -5,10 +5,12 @@ potion-multilingual-128M ONNX模型量化工具
 用途：减少模型体积(489MB -> 123MB)，便于在浏览器/边缘设备部署
 
 使用方法：
-    python quantize_model.py
+    python quantize_model.py          # INT8
+    python quantize_model.py --int4   # INT4（两个权重打包进一个字节，需 opset 21）
 
 输入模型：potion-multilingual-128M/model.onnx (FP32, 489MB)
 输出模型：potion-multilingual-128M/model_int8.onnx (INT8, 123MB)
+          potion-multilingual-128M/model_int4.onnx (INT4, 约62MB)
 
 量化效果：
     - 原始模型: 489MB
@@ -26,69 +28,134 @@ potion-multilingual-128M ONNX模型量化工具
     - 但仍比调用远程API快很多(通常100-500ms)
 """
 
-import numpy as np
-import onnx
-from onnx import TensorProto, numpy_helper, helper, AttributeProto
 import os
+import sys
+
+# numpy / onnx 在各函数内按需导入：仅引用本模块常量时不加载 onnx 的 protobuf 描述符
 
 INPUT_PATH = os.path.join(os.path.dirname(__file__), "models/potion-multilingual-128M/model.onnx")
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "models/potion-multilingual-128M/model_int8.onnx")
+OUTPUT_PATH_INT4 = os.path.join(os.path.dirname(__file__), "models/potion-multilingual-128M/model_int4.onnx")
 
+# quantize_weight 每次处理的行数（256维 float32 约 4MB/块）
+QUANT_BLOCK_ROWS = 4096
 
-def quantize_weight(weight_fp32):
-    """
-    将FP32权重量化为UINT8
-    
-    量化公式: quantized = round(fp32 / scale + zero_point)
-    反量化公式: fp32 = (quantized - zero_point) * scale
+
+def quantize_weight(weight_fp32, bits=8):
     """
-    min_val = weight_fp32.min()
-    max_val = weight_fp32.max()
+    将FP32权重按行（axis=0）量化为UINT8 / UINT4
     
-    scale = (max_val - min_val) / 255.0
-    zero_point = int(round(-min_val / scale))
-    zero_point = max(0, min(255, zero_point))
+    每一行独立计算 scale / zero_point，个别离群行不会挤占其他行的动态范围
     
-    weight_scaled = weight_fp32 / scale + zero_point
-    weight_uint8 = np.clip(np.round(weight_scaled), 0, 255).astype(np.uint8)
+    量化公式: quantized = round(fp32 / scale[i] + zero_point[i])
+    反量化公式: fp32 = (quantized - zero_point[i]) * scale[i]
     
-    return weight_uint8, np.float32(scale), np.uint8(zero_point)
-
-
-def update_node_inputs(node, old_name, new_name):
-    """更新节点及其子图中的输入引用"""
-    for i in range(len(node.input)):
-        if node.input[i] == old_name:
-            node.input[i] = new_name
+    bits=4 时取值范围为 0..15，仍以 uint8 数组返回，由 pack_uint4() 打包
+    """
+    import numpy as np
+    
+    qmax = (1 << bits) - 1
+    num_rows = weight_fp32.shape[0]
+    
+    weight_uint8 = np.empty(weight_fp32.shape, dtype=np.uint8)
+    scale = np.empty(num_rows, dtype=np.float32)
+    zero_point = np.empty(num_rows, dtype=np.uint8)
+    
+    # 按行分块处理：min/max、除法、取整、截断都在缓存内的小块上完成，
+    # 临时数组只有一块大小，不随整张权重表（数百 MB）增长
+    for start in range(0, num_rows, QUANT_BLOCK_ROWS):
+        end = min(start + QUANT_BLOCK_ROWS, num_rows)
+        block = weight_fp32[start:end]
+        # 范围扩展到包含0：zero_point 只能取 0..qmax，全正/全负的行若不扩展会塌缩成同一个量化值
+        min_val = np.minimum(block.min(axis=1), 0)
+        max_val = np.maximum(block.max(axis=1), 0)
+        
+        block_scale = ((max_val - min_val) / qmax).astype(np.float32)
+        # 只有全零行（如 padding 行）范围为0，scale 取1避免除零，量化为 zero_point=0 可精确还原
+        block_scale[block_scale == 0] = 1.0
+        block_zp = np.clip(np.round(-min_val / block_scale), 0, qmax).astype(np.uint8)
+        
+        # to_array 返回的数组直接引用 protobuf 字节（只读），除法产生块内唯一的可写临时数组
+        scaled = np.divide(block, block_scale[:, None], dtype=np.float32)
+        scaled += block_zp[:, None]
+        np.rint(scaled, out=scaled)
+        np.clip(scaled, 0, qmax, out=scaled)
+        
+        weight_uint8[start:end] = scaled
+        scale[start:end] = block_scale
+        zero_point[start:end] = block_zp
+    
+    return weight_uint8, scale, zero_point
+
+
+def pack_uint4(values):
+    """按 ONNX UINT4 布局打包：相邻两个元素存一个字节，前一个占低4位"""
+    import numpy as np
+    
+    flat = values.reshape(-1)
+    if flat.size % 2:
+        flat = np.append(flat, np.uint8(0))
+    return (flat[0::2] & 0x0F) | ((flat[1::2] & 0x0F) << 4)
+
+
+def rename_inputs(graph, mapping):
+    """一次遍历图（含子图），按 mapping 批量重命名节点输入引用"""
+    from onnx import AttributeProto
     
-    for attr in node.attribute:
-        if attr.type == AttributeProto.GRAPH:
-            update_graph_inputs(attr.g, old_name, new_name)
-
-
-def update_graph_inputs(graph, old_name, new_name):
-    """递归更新图中所有节点的输入引用"""
     for node in graph.node:
-        update_node_inputs(node, old_name, new_name)
-
-
-def quantize_model():
+        for i, name in enumerate(node.input):
+            if name in mapping:
+                node.input[i] = mapping[name]
+        
+        for attr in node.attribute:
+            if attr.type == AttributeProto.GRAPH:
+                rename_inputs(attr.g, mapping)
+            elif attr.type == AttributeProto.GRAPHS:
+                for subgraph in attr.graphs:
+                    rename_inputs(subgraph, mapping)
+
+
+def quantize_model(bits=8):
     """主量化流程"""
+    import onnx
+    from onnx import TensorProto, numpy_helper, helper, version_converter
+    
+    output_path = OUTPUT_PATH_INT4 if bits == 4 else OUTPUT_PATH
     print(f"读取模型: {INPUT_PATH}")
     print(f"原始大小: {os.path.getsize(INPUT_PATH) / 1024 / 1024:.1f} MB")
     
-    model = onnx.load(INPUT_PATH)
+    # 外部数据（若有）先不读入，只在下面按需加载目标权重；
+    # 其他外部张量保留原引用，输出与输入同目录，引用依然有效
+    model = onnx.load(INPUT_PATH, load_external_data=False)
+    
+    # 按轴反量化（一维 scale/zero_point）需要 opset >= 13，UINT4 输入需要 opset >= 21；
+    # 只改 opset_import 不会迁移已有节点（如 ReduceMean 的 axes 属性在 opset 18 改为输入），
+    # 必须在插入反量化节点之前用版本转换器整体升级
+    min_opset = 21 if bits == 4 else 13
+    current_opset = next(
+        (opset.version for opset in model.opset_import if opset.domain in ("", "ai.onnx")),
+        None
+    )
+    if current_opset is not None and current_opset < min_opset:
+        print(f"转换 opset {current_opset} -> {min_opset}")
+        try:
+            model = version_converter.convert_version(model, min_opset)
+        except Exception as e:
+            print(f"错误: opset 转换失败，未生成量化模型: {e}")
+            sys.exit(1)
     graph = model.graph
     
     target_weight_name = "embedding_bag.weight"
     quantized_info = None
+    target_index = None
     
-    for init in graph.initializer:
+    for index, init in enumerate(graph.initializer):
         if init.name == target_weight_name:
-            weight_fp32 = numpy_helper.to_array(init)
+            target_index = index
+            weight_fp32 = numpy_helper.to_array(init, base_dir=os.path.dirname(INPUT_PATH))
             print(f"原始权重: shape={weight_fp32.shape}, dtype={weight_fp32.dtype}")
             
-            weight_uint8, scale, zero_point = quantize_weight(weight_fp32)
+            weight_uint8, scale, zero_point = quantize_weight(weight_fp32, bits)
             print(f"量化权重: shape={weight_uint8.shape}, dtype={weight_uint8.dtype}")
             
             quantized_info = {
@@ -98,6 +165,8 @@ def quantize_model():
                 'shape': list(weight_fp32.shape),
                 'original_name': target_weight_name
             }
+            # FP32 权重不再需要，尽早释放，避免与序列化输出同时驻留内存
+            del weight_fp32
             break
     
     if not quantized_info:
@@ -106,68 +175,70 @@ def quantize_model():
     
     print("\n修改模型...")
     
-    new_initializers = []
-    for init in graph.initializer:
-        if init.name != target_weight_name:
-            new_initializers.append(init)
+    if bits == 4:
+        quant_type = TensorProto.UINT4
+        weight_bytes = pack_uint4(quantized_info['uint8']).tobytes()
+        zp_bytes = pack_uint4(quantized_info['zero_point']).tobytes()
+    else:
+        quant_type = TensorProto.UINT8
+        weight_bytes = quantized_info['uint8'].tobytes()
+        zp_bytes = quantized_info['zero_point'].tobytes()
     
     quantized_weight_init = helper.make_tensor(
         name="embedding_bag.weight.quantized",
-        data_type=TensorProto.UINT8,
+        data_type=quant_type,
         dims=quantized_info['shape'],
-        vals=quantized_info['uint8'].tobytes(),
+        vals=weight_bytes,
         raw=True
     )
-    new_initializers.append(quantized_weight_init)
     
+    num_rows = quantized_info['shape'][0]
     scale_init = helper.make_tensor(
         name="embedding_bag.weight.scale",
         data_type=TensorProto.FLOAT,
-        dims=[1],
-        vals=[quantized_info['scale']],
-        raw=False
+        dims=[num_rows],
+        vals=quantized_info['scale'].tobytes(),
+        raw=True
     )
-    new_initializers.append(scale_init)
     
     zp_init = helper.make_tensor(
         name="embedding_bag.weight.zero_point",
-        data_type=TensorProto.UINT8,
-        dims=[1],
-        vals=[int(quantized_info['zero_point'])],
-        raw=False
+        data_type=quant_type,
+        dims=[num_rows],
+        vals=zp_bytes,
+        raw=True
     )
-    new_initializers.append(zp_init)
     
-    del graph.initializer[:]
-    graph.initializer.extend(new_initializers)
+    # 只移除目标权重，其余上千个 initializer 原地保留，不整体重建 repeated 字段
+    del graph.initializer[target_index]
+    graph.initializer.extend([quantized_weight_init, scale_init, zp_init])
     
     dequant_node = helper.make_node(
         "DequantizeLinear",
         inputs=["embedding_bag.weight.quantized", "embedding_bag.weight.scale", "embedding_bag.weight.zero_point"],
         outputs=["embedding_bag.weight.dequant"],
-        name="DequantizeLinear_embedding_bag"
+        name="DequantizeLinear_embedding_bag",
+        axis=0
     )
     
-    new_nodes = [dequant_node]
-    for node in graph.node:
-        update_node_inputs(node, target_weight_name, "embedding_bag.weight.dequant")
-        new_nodes.append(node)
+    rename_inputs(graph, {target_weight_name: "embedding_bag.weight.dequant"})
     
-    del graph.node[:]
-    graph.node.extend(new_nodes)
+    # 反量化节点放在最前面，保持拓扑序
+    graph.node.insert(0, dequant_node)
     
     print("验证模型...")
     try:
         onnx.checker.check_model(model)
         print("✓ 模型验证通过")
     except Exception as e:
-        print(f"模型验证警告: {str(e)[:100]}...")
+        print(f"错误: 模型验证失败，未保存: {e}")
+        sys.exit(1)
     
-    print(f"\n保存量化模型: {OUTPUT_PATH}")
-    onnx.save(model, OUTPUT_PATH)
-    print(f"量化后大小: {os.path.getsize(OUTPUT_PATH) / 1024 / 1024:.1f} MB")
-    print(f"压缩比: {os.path.getsize(INPUT_PATH) / os.path.getsize(OUTPUT_PATH):.1f}x")
+    print(f"\n保存量化模型: {output_path}")
+    onnx.save(model, output_path)
+    print(f"量化后大小: {os.path.getsize(output_path) / 1024 / 1024:.1f} MB")
+    print(f"压缩比: {os.path.getsize(INPUT_PATH) / os.path.getsize(output_path):.1f}x")
 
 
 if __name__ == "__main__":
-    quantize_model()
+    quantize_model(bits=4 if "--int4" in sys.argv[1:] else 8)
@@ -2,14 +2,106 @@
 MemoryX Client - Python SDK for MemoryX API
 """
 
+import copy
 import json
-import hashlib
-import platform
-import socket
+import http.client
 import os
-from typing import Optional, List, Dict, Any
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+import select
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Iterable, List, Dict, Any, Tuple
+from urllib.parse import urlencode, urlsplit
+
+try:
+    import orjson
+    
+    # orjson works on bytes directly, skipping the encode/decode steps
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    
+    _loads = json.loads
+
+
+@lru_cache(maxsize=1)
+def _machine_fingerprint() -> str:
+    """Compute the machine fingerprint once per process (platform probes are slow)"""
+    # Imported lazily: only needed at registration time
+    import hashlib
+    import platform
+    import socket
+    
+    components = [
+        socket.gethostname(),
+        platform.system(),
+        platform.machine(),
+        platform.processor() or "unknown",
+        str(os.cpu_count() or 0)
+    ]
+    raw = "|".join(components)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+# Methods that can be re-sent after a dropped connection without side effects
+_RETRY_SAFE_METHODS = frozenset(("GET", "DELETE"))
+
+
+def _open_connection(base_url: str) -> Tuple[http.client.HTTPConnection, str, Dict[str, str]]:
+    """
+    Open a connection for base_url; returns (connection, path prefix, proxy headers)
+    
+    Honours HTTP(S)_PROXY / NO_PROXY like urllib: https goes through a CONNECT
+    tunnel, plain http sends absolute URLs to the proxy.
+    """
+    # Imported lazily: only needed when connecting, and urllib.request is slow to import
+    import urllib.request
+    from base64 import b64encode
+    from urllib.parse import unquote
+    
+    parts = urlsplit(base_url)
+    is_https = parts.scheme == "https"
+    conn_cls = http.client.HTTPSConnection if is_https else http.client.HTTPConnection
+    path_prefix = parts.path.rstrip("/")
+    
+    proxy = urllib.request.getproxies().get(parts.scheme)
+    if not proxy or urllib.request.proxy_bypass(parts.hostname):
+        return conn_cls(parts.hostname, parts.port, timeout=30), path_prefix, {}
+    
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    proxy_parts = urlsplit(proxy)
+    proxy_headers = {}
+    if proxy_parts.username:
+        credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+        proxy_headers["Proxy-Authorization"] = "Basic " + b64encode(credentials.encode()).decode()
+    
+    conn = conn_cls(proxy_parts.hostname, proxy_parts.port, timeout=30)
+    if is_https:
+        conn.set_tunnel(parts.hostname, parts.port, headers=proxy_headers)
+        return conn, path_prefix, {}
+    return conn, f"http://{parts.netloc}{path_prefix}", proxy_headers
+
+
+def _connection_dropped(conn: http.client.HTTPConnection) -> bool:
+    """An idle connection that is readable (peer closed it or sent stray data) can't be reused"""
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def _format_memory(m: Dict[str, Any], score: float) -> Dict[str, Any]:
+    """Normalize one memory row from a search/list response"""
+    get = m.get
+    return {
+        "id": get("id"),
+        "content": get("memory") or get("content"),
+        "category": get("category", "other"),
+        "score": score
+    }
 
 
 class MemoryXError(Exception):
@@ -22,6 +114,17 @@ class APIClient:
     
     DEFAULT_API_BASE = "https://t0ken.ai/api"
     
+    _BASE_HEADERS = {
+        "Content-Type": "application/json",
+        "User-Agent": "memoryx-python/2.0.0"
+    }
+    
+    # Seconds a get_quota()/list() response may be reused. Off by default: memories
+    # are processed asynchronously, so a cached list() can miss recent additions.
+    # Set on the class or instance (e.g. 2.0) to opt in for callers that poll.
+    QUOTA_CACHE_TTL = 0.0
+    LIST_CACHE_TTL = 0.0
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize MemoryX client
@@ -40,6 +143,20 @@ class APIClient:
         self.api_base_url: str = config.get("api_base_url", self.DEFAULT_API_BASE)
         self.project_id: str = config.get("project_id", "default")
         self.user_id: Optional[str] = config.get("user_id")
+        
+        # Persistent keep-alive connection reused across calls (one TCP/TLS handshake)
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._conn_base_url: Optional[str] = None
+        self._path_prefix = ""
+        self._proxy_headers: Dict[str, str] = {}
+        self._conn_lock = threading.Lock()
+        
+        self._headers: Dict[str, str] = {}
+        self._headers_api_key: Optional[str] = None
+        self._rebuild_headers()
+        
+        # Short-lived GET response cache: key -> (expiry on time.monotonic(), response)
+        self._response_cache: Dict[tuple, Tuple[float, dict]] = {}
     
     def get_api_key(self) -> Optional[str]:
         """Get current API key"""
@@ -79,48 +196,118 @@ class APIClient:
         self.user_id = user_id
     
     def get_machine_fingerprint(self) -> str:
-        """Generate machine fingerprint based on hardware info"""
-        components = [
-            socket.gethostname(),
-            platform.system(),
-            platform.machine(),
-            platform.processor() or "unknown",
-            str(os.cpu_count() or 0)
-        ]
-        raw = "|".join(components)
-        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+        """Generate machine fingerprint based on hardware info (cached per process)"""
+        return _machine_fingerprint()
     
-    def _request(self, method: str, endpoint: str, data: Optional[dict] = None) -> dict:
-        """Send HTTP request"""
-        url = f"{self.api_base_url}{endpoint}"
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": f"memoryx-python/2.0.0"
-        }
-        
+    def _get_connection(self) -> http.client.HTTPConnection:
+        """Get the persistent connection, rebuilding it if api_base_url changed"""
+        if self._conn is None or self._conn_base_url != self.api_base_url:
+            self.close()
+            self._conn, self._path_prefix, self._proxy_headers = _open_connection(self.api_base_url)
+            self._conn_base_url = self.api_base_url
+        elif self._conn.sock is not None and _connection_dropped(self._conn):
+            # Server closed the idle connection: drop it so this request reconnects
+            self._conn.close()
+        return self._conn
+    
+    def close(self) -> None:
+        """Close the persistent connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _rebuild_headers(self) -> None:
+        """Rebuild request headers for the current api_key; reused by every request"""
+        headers = dict(self._BASE_HEADERS)
         if self.api_key:
             headers["X-API-Key"] = self.api_key
+        self._headers = headers
+        self._headers_api_key = self.api_key
+    
+    def _request(self, method: str, endpoint: str, data: Optional[dict] = None) -> dict:
+        """Send HTTP request"""
+        # api_key may change via set_api_key(), auto_register() or direct assignment
+        if self._headers_api_key != self.api_key:
+            self._rebuild_headers()
+        headers = self._headers
         
-        req = Request(
-            url,
-            data=json.dumps(data).encode() if data else None,
-            headers=headers,
-            method=method
-        )
+        body = _dumps(data) if data else None
         
         try:
-            with urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode())
-        except HTTPError as e:
-            error_body = e.read().decode()
+            with self._conn_lock:
+                conn = self._get_connection()
+                if self._proxy_headers:
+                    headers = {**headers, **self._proxy_headers}
+                path = self._path_prefix + endpoint
+                # A live socket means this request reuses an existing keep-alive connection
+                reused = conn.sock is not None
+                sent = False
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    sent = True
+                    response = conn.getresponse()
+                except (http.client.BadStatusLine, ConnectionError):
+                    # Reconnect and retry once if a reused connection dropped before any
+                    # response. A POST that was already sent is not re-sent: the server
+                    # may have processed it, and a retry would store the memories twice
+                    if not reused or (sent and method not in _RETRY_SAFE_METHODS):
+                        raise
+                    conn.close()
+                    conn.request(method, path, body=body, headers=headers)
+                    response = conn.getresponse()
+                status = response.status
+                raw = response.read()
+        except Exception as e:
+            self.close()
+            raise MemoryXError(f"Request failed: {str(e)}")
+        
+        if status >= 400:
+            # Parse the bytes directly; only a non-JSON body is decoded, capped so
+            # large HTML error pages don't end up in the exception message
             try:
-                error_data = json.loads(error_body)
-                raise MemoryXError(error_data.get("detail", error_data.get("message", f"HTTP {e.code}")))
+                error_data = _loads(raw)
             except json.JSONDecodeError:
-                raise MemoryXError(f"HTTP {e.code}: {error_body}")
+                raise MemoryXError(f"HTTP {status}: {raw[:512].decode('utf-8', 'replace')}")
+            raise MemoryXError(error_data.get("detail") or error_data.get("message") or f"HTTP {status}")
+        
+        try:
+            return _loads(raw)
         except Exception as e:
             raise MemoryXError(f"Request failed: {str(e)}")
     
+    def _cached_get(self, key: tuple, ttl: float, endpoint: str) -> dict:
+        """
+        GET endpoint, reusing a response younger than ttl seconds for the same key
+        
+        ttl <= 0 disables caching. Cached responses are handed out as copies so
+        one caller's edits can't leak into another caller's result.
+        """
+        if ttl <= 0:
+            return self._request("GET", endpoint)
+        
+        now = time.monotonic()
+        entry = self._response_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return copy.deepcopy(entry[1])
+        
+        result = self._request("GET", endpoint)
+        
+        # Drop expired entries so paging through list() doesn't grow the cache
+        for k in [k for k, (expiry, _) in self._response_cache.items() if expiry <= now]:
+            del self._response_cache[k]
+        self._response_cache[key] = (now + ttl, result)
+        return copy.deepcopy(result)
+    
+    def invalidate_cache(self) -> None:
+        """Forget cached get_quota()/list() responses"""
+        self._response_cache.clear()
+    
     def auto_register(self, agent_type: str = "python_sdk", agent_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Auto-register to get API Key
@@ -136,6 +323,9 @@ class APIClient:
                 "project_id": "..."
             }
         """
+        import platform
+        import socket
+        
         if agent_name is None:
             agent_name = socket.gethostname()
         
@@ -165,12 +355,12 @@ class APIClient:
             "project_id": str(result.get("project_id", ""))
         }
     
-    def send_memories(self, memories: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def send_memories(self, memories: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Send memories (single or batch)
         
         Args:
-            memories: List of memory dicts, each with:
+            memories: List (or any iterable, e.g. a generator) of memory dicts, each with:
                 - content: Memory content (required)
                 - metadata: Optional metadata dict with category etc.
         
@@ -185,6 +375,10 @@ class APIClient:
         if not self.api_key:
             raise MemoryXError("Not authenticated. Call auto_register() first.")
         
+        # Materialize tuples/generators once; lists pass through without a copy
+        if not isinstance(memories, list):
+            memories = list(memories)
+        
         if not memories:
             return {"success": True}
         
@@ -204,6 +398,8 @@ class APIClient:
             }
             result = self._request("POST", "/v1/memories/batch", data)
         
+        self._response_cache.clear()
+        
         return {
             "success": True,
             "task_id": result.get("task_id"),
@@ -231,16 +427,17 @@ class APIClient:
         if not messages:
             return {"success": True}
         
-        import time
-        
-        formatted_messages = []
-        for m in messages:
-            formatted_messages.append({
+        # One timestamp for the whole batch instead of one clock read per message
+        now_ms = int(time.time() * 1000)
+        formatted_messages = [
+            {
                 "role": m["role"],
                 "content": m["content"],
-                "timestamp": m.get("timestamp", int(time.time() * 1000)),
+                "timestamp": m.get("timestamp", now_ms),
                 "tokens": m.get("tokens", 0)
-            })
+            }
+            for m in messages
+        ]
         
         data = {
             "conversation_id": conversation_id,
@@ -249,6 +446,8 @@ class APIClient:
         
         result = self._request("POST", "/v1/conversations/flush", data)
         
+        self._response_cache.clear()
+        
         return {
             "success": True,
             "task_id": result.get("task_id"),
@@ -283,23 +482,8 @@ class APIClient:
         result = self._request("POST", "/v1/memories/search", data)
         
         # Normalize response
-        formatted_data = []
-        for m in result.get("data", []):
-            formatted_data.append({
-                "id": m.get("id"),
-                "content": m.get("memory") or m.get("content"),
-                "category": m.get("category", "other"),
-                "score": m.get("score", 0.5)
-            })
-        
-        related = []
-        for m in result.get("related_memories", []):
-            related.append({
-                "id": m.get("id"),
-                "content": m.get("memory") or m.get("content"),
-                "category": m.get("category", "other"),
-                "score": m.get("score", 0)
-            })
+        formatted_data = [_format_memory(m, m.get("score", 0.5)) for m in result.get("data", ())]
+        related = [_format_memory(m, m.get("score", 0)) for m in result.get("related_memories", ())]
         
         return {
             "success": True,
@@ -312,6 +496,10 @@ class APIClient:
         """
         List memories
         
+        If LIST_CACHE_TTL is set, identical calls within that many seconds reuse
+        the previous response; send_memories(), send_conversation() and delete()
+        clear the cache.
+        
         Args:
             limit: Maximum results (default: 50)
             offset: Pagination offset (default: 0)
@@ -326,19 +514,17 @@ class APIClient:
         if not self.api_key:
             raise MemoryXError("Not authenticated. Call auto_register() first.")
         
-        params = f"?limit={limit}&offset={offset}&project_id={self.project_id}"
+        # urlencode percent-escapes project_id (spaces, '&', non-ASCII)
+        params = urlencode({"limit": limit, "offset": offset, "project_id": self.project_id})
         
-        result = self._request("GET", f"/v1/memories/list{params}")
+        result = self._cached_get(
+            ("list", self.api_key, limit, offset, self.project_id),
+            self.LIST_CACHE_TTL,
+            f"/v1/memories/list?{params}"
+        )
         
         # Normalize response
-        formatted_data = []
-        for m in result.get("data", []):
-            formatted_data.append({
-                "id": m.get("id"),
-                "content": m.get("memory") or m.get("content"),
-                "category": m.get("category", "other"),
-                "score": 0
-            })
+        formatted_data = [_format_memory(m, 0) for m in result.get("data", ())]
         
         return {
             "success": True,
@@ -360,6 +546,7 @@ class APIClient:
             raise MemoryXError("Not authenticated. Call auto_register() first.")
         
         self._request("DELETE", f"/v1/memories/{memory_id}")
+        self._response_cache.clear()
         return {"success": True}
     
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
@@ -386,22 +573,29 @@ class APIClient:
         Get quota information
         
         Returns:
-            Quota info dict
+            Quota info dict (reused for QUOTA_CACHE_TTL seconds, if set)
         """
         if not self.api_key:
             raise MemoryXError("Not authenticated. Call auto_register() first.")
         
-        return self._request("GET", "/v1/quota")
+        return self._cached_get(("quota", self.api_key), self.QUOTA_CACHE_TTL, "/v1/quota")
 
 
 # Backward compatibility alias
 MemoryXClient = APIClient
 
 
+# Clients returned by connect_memory, keyed by base_url; repeat calls skip config I/O
+_client_cache: Dict[Optional[str], APIClient] = {}
+
+
 def connect_memory(base_url: Optional[str] = None, verbose: bool = True) -> APIClient:
     """
     Quick connect to MemoryX
     
+    The client is created once per base_url and cached for the process;
+    call connect_memory.cache_clear() to force a fresh one (e.g. in tests).
+    
     Args:
         base_url: API base URL (optional)
         verbose: Print usage guide (default: True)
@@ -415,6 +609,10 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True) -> APIC
         >>> client.send_memories([{"content": "User prefers dark mode"}])
         >>> results = client.search("preferences")
     """
+    client = _client_cache.get(base_url)
+    if client is not None:
+        return client
+    
     config = {}
     if base_url:
         config["api_base_url"] = base_url
@@ -425,8 +623,8 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True) -> APIC
     config_path = os.path.expanduser("~/.memoryx/config.json")
     if os.path.exists(config_path):
         try:
-            with open(config_path, "r") as f:
-                saved_config = json.load(f)
+            with open(config_path, "rb") as f:
+                saved_config = _loads(f.read())
             if saved_config.get("machine_fingerprint") == client.get_machine_fingerprint():
                 if saved_config.get("api_key"):
                     client.set_api_key(saved_config["api_key"])
@@ -434,6 +632,7 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True) -> APIC
                         print("Connected to MemoryX")
                     if verbose:
                         _print_usage_guide()
+                    _client_cache[base_url] = client
                     return client
         except Exception:
             pass
@@ -457,8 +656,19 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True) -> APIC
             "base_url": client.api_base_url
         }
         
-        with open(os.path.join(config_dir, "config.json"), "w") as f:
-            json.dump(saved_config, f)
+        # Write to a temp file and atomically replace, so a crash never leaves a truncated
+        # config; the temp name is unique so concurrent first registrations don't collide
+        import tempfile
+        
+        config_path = os.path.join(config_dir, "config.json")
+        fd, tmp_path = tempfile.mkstemp(dir=config_dir, prefix="config.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_dumps(saved_config))
+            os.replace(tmp_path, config_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
         
         if verbose:
             print(f"MemoryX activated")
@@ -469,9 +679,13 @@ def connect_memory(base_url: Optional[str] = None, verbose: bool = True) -> APIC
     if verbose:
         _print_usage_guide()
     
+    _client_cache[base_url] = client
     return client
 
 
+connect_memory.cache_clear = _client_cache.clear
+
+
 def _print_usage_guide():
     """Print usage guide"""
     guide = """
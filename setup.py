@@ -11,6 +11,9 @@ setup(
     url="https://t0ken.ai",
     packages=find_packages(),
     python_requires=">=3.7",
+    extras_require={
+        "fast": ["orjson>=3.9.0"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",